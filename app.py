@@ -7,6 +7,7 @@ import visualisasi
 import modeling
 import prediction
 import contact
+import profiling
 
 # ======================================
 # PAGE CONFIG
@@ -139,7 +140,7 @@ with st.sidebar:
         index=0
     )
 
-    uploaded = st.file_uploader("📂 Upload Dataset (CSV)", type=["csv"])
+    uploaded = st.file_uploader("📂 Upload Dataset (CSV / .csv.gz / .csv.zst)", type=["csv", "gz", "zst"])
 
     st.markdown("---")
     menu = st.radio(
@@ -148,6 +149,16 @@ with st.sidebar:
         index=0
     )
 
+    # profiling hanya aktif bila dicentang (mode normal tanpa overhead)
+    profiling_on = st.checkbox("⏱️ Mode Profiling", value=False,
+                               help="Tampilkan rincian waktu per tahap di bawah halaman")
+    profiling_dump = False
+    if profiling_on:
+        profiling_dump = st.checkbox("Simpan file cProfile (.prof)", value=False)
+
+    compact = st.checkbox("🪶 Mode hemat memori (float32)", value=False,
+                          help="Fitur float32 + target int8; dataset dibagi sebagai view antar halaman")
+
     st.markdown("---")
     st.subheader("🤖 Pilih Algoritma (Prediction)")
     algo_choice = st.selectbox(
@@ -167,6 +178,9 @@ with st.sidebar:
 st.session_state["dataset_mode"] = dataset_mode
 st.session_state["uploaded_file"] = uploaded
 st.session_state["algo_choice"] = algo_choice
+st.session_state["profiling"] = profiling_on
+st.session_state["profiling_dump"] = profiling_dump
+st.session_state["compact"] = compact
 
 # ======================================
 # HIGHLIGHT CARDS (CLICKABLE EXPANDER)
@@ -246,13 +260,13 @@ elif menu == "Steps":
     steps.steps_page()
 
 elif menu == "Visualization":
-    visualisasi.visualization_page()
+    profiling.run_page("Visualization", visualisasi.visualization_page)
 
 elif menu == "Modeling":
-    modeling.modeling_page()
+    profiling.run_page("Modeling", modeling.modeling_page)
 
 elif menu == "Prediction":
-    prediction.prediction_page()
+    profiling.run_page("Prediction", prediction.prediction_page)
 
 elif menu == "Contact":
     contact.contact_page()
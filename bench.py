@@ -0,0 +1,387 @@
+import argparse
+import gzip
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+import ingest
+from charts import histogram_counts, roc_frame
+from data_loader import COLUMN_DTYPES, _load_cached, _prep_environment, _prep_health, compact_frame, load_and_prepare
+from dataset_cache import content_hash, default_dataset_cache
+from inference import RoutedScorer, compile_verified
+from ingest import fast_engine
+from metrics import (binary_metrics, binary_report, evaluate_models, operating_point, roc_from_curve, roc_points,
+                     threshold_sweep)
+from modeling import _get_models
+from racing import race
+from streaming import StreamingRun
+from training import (SPLIT_SEED, TEST_SIZE, TrainingCache, TrainingRun, dataset_fingerprint, make_scaler,
+                      score_metrics)
+
+HEALTH_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "BreastCancer.csv")
+STATIONS = ["DKI1 (Bunderan HI)", "DKI2 (Kelapa Gading)", "DKI3 (Jagakarsa)",
+            "DKI4 (Lubang Buaya)", "DKI5 (Kebon Jeruk)"]
+
+
+# =========================================================
+# DATA SINTETIS (BENTUK SAMA DENGAN ISPU JAKARTA)
+# =========================================================
+def make_ispu(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "tanggal": pd.Timestamp("2010-01-01") + pd.to_timedelta(np.arange(n_rows) // len(STATIONS), unit="D"),
+        "stasiun": rng.choice(STATIONS, n_rows),
+    })
+    for col, scale in [("pm10", 60), ("pm25", 80), ("so2", 30), ("co", 20), ("o3", 50), ("no2", 20)]:
+        df[col] = np.round(rng.gamma(4.0, scale / 4.0, n_rows))
+    pollutants = ["pm10", "pm25", "so2", "co", "o3", "no2"]
+    df["max"] = df[pollutants].max(axis=1)
+    df["critical"] = df[pollutants].idxmax(axis=1).str.upper()
+    df["categori"] = np.select(
+        [df["max"] <= 50, df["max"] <= 100, df["max"] <= 200, df["max"] <= 300],
+        ["BAIK", "SEDANG", "TIDAK SEHAT", "SANGAT TIDAK SEHAT"],
+        "BERBAHAYA",
+    )
+    # sedikit noise label + missing value agar mirip data asli
+    noise = rng.random(n_rows) < 0.05
+    df.loc[noise, "categori"] = "SEDANG"
+    df.loc[rng.random(n_rows) < 0.01, "pm10"] = np.nan
+    return df
+
+
+# =========================================================
+# TIMER
+# =========================================================
+def _timeit(fn, repeat: int = 1):
+    best = None
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+class Bench:
+    def __init__(self, repeat: int = 1):
+        self.repeat = repeat
+        self.results = []
+
+    def record(self, dataset: str, rows, stage: str, name: str, fn, **extra):
+        seconds, out = _timeit(fn, self.repeat)
+        if rows is None:
+            rows = len(out)
+        row = {"dataset": dataset, "rows": rows, "stage": stage, "name": name,
+               "seconds": seconds, "rows_per_s": rows / seconds if seconds else None, **extra}
+        self.results.append(row)
+        print(f"{dataset:>14} {rows:>10,} {stage:<10} {name:<22} {seconds:9.4f}s")
+        return out
+
+
+# =========================================================
+# SUITE
+# =========================================================
+def bench_dataset(bench: Bench, label: str, csv_path: str, preparer, dataset_type: str,
+                  max_train_rows: int, skip_models: set, n_jobs: int):
+    raw = bench.record(label, None, "load", "read_csv", lambda: pd.read_csv(csv_path))
+    for engine in ["pandas", "pyarrow"] if fast_engine() == "pyarrow" else ["pandas"]:
+        bench.record(label, None, "load", f"ingest ({engine})",
+                     lambda: ingest.read_csv(csv_path, dtype=COLUMN_DTYPES, engine=engine)[0])
+    n = len(raw)
+
+    pack = bench.record(label, n, "load", preparer.__name__, lambda: preparer(raw))
+    mode = "Kesehatan (Breast Cancer)" if dataset_type == "health" else "Lingkungan (ISPU Udara)"
+
+    def load_cold():
+        _load_cached.clear()
+        default_dataset_cache().clear()
+        return load_and_prepare(csv_path, mode)
+
+    def load_disk():
+        # proses baru: cache memori kosong, cache dataset di disk masih ada
+        _load_cached.clear()
+        return load_and_prepare(csv_path, mode)
+
+    bench.record(label, n, "load", "load_and_prepare", load_cold)
+    bench.record(label, n, "load", "load_and_prepare (disk)", load_disk)
+
+    X, y = pack["X"], pack["y"]
+    if len(X) > max_train_rows:
+        # SVM/KNN tidak realistis pada jutaan baris -> subsample terstratifikasi
+        X, _, y, _ = train_test_split(X, y, train_size=max_train_rows, random_state=SPLIT_SEED, stratify=y)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=y
+    )
+    n_train = len(X_train)
+    n_test = len(X_test)
+
+    # representasi compact (float32 / int8) dibandingkan dengan baseline float64
+    X_train32, X_test32 = compact_frame(X_train), compact_frame(X_test)
+    y_train8 = y_train.astype(np.int8)
+
+    models = {k: v for k, v in _get_models(dataset_type, n_rows=n_train).items() if k not in skip_models}
+    for name, mdl in models.items():
+        pipe = Pipeline([("scaler", make_scaler(X_train, pack["meta"])), ("model", sklearn.clone(mdl))])
+        bench.record(label, n_train, "fit", name, lambda: pipe.fit(X_train, y_train))
+        bench.record(label, n_test, "predict", name, lambda: pipe.predict(X_test))
+        proba = bench.record(label, n_test, "proba", name, lambda: pipe.predict_proba(X_test))
+        recall = getattr(pipe.named_steps["model"], "recall_", None)
+        if recall is not None:
+            # recall@k indeks KNN terhadap brute force (1.0 = eksak)
+            bench.results[-1]["index_recall"] = recall
+        scorer, _ = compile_verified(pipe, X_test.head(512))
+        if scorer.kind != "sklearn":
+            # scorer compiled (Prediction / serve.py) tidak boleh lebih lambat dari sklearn di batch penuh
+            bench.record(label, n_test, "score", f"{name} ({scorer.kind})", lambda: scorer.score(X_test))
+            ratio = bench.results[-1]["seconds"] / bench.results[-2]["seconds"]
+            bench.results[-1]["vs_sklearn_proba"] = ratio
+            if ratio > 1.25:
+                print(f"{'':>14} {'':>10} {'score':<10} {name:<22} {ratio:.2f}x predict_proba  <-- cek")
+        m64 = score_metrics(y_test, pipe.predict(X_test), proba[:, 1])
+
+        pipe32 = Pipeline([("scaler", make_scaler(X_train, pack["meta"])), ("model", sklearn.clone(mdl))])
+        bench.record(label, n_train, "fit", f"{name} (float32)", lambda: pipe32.fit(X_train32, y_train8))
+        m32 = score_metrics(y_test, pipe32.predict(X_test32), pipe32.predict_proba(X_test32)[:, 1])
+        delta = {k: m32[k] - m64[k] for k in ("F1", "AUC")}
+        bench.results[-1].update({"f1_float64": m64["F1"], "auc_float64": m64["AUC"],
+                                  "f1_delta": delta["F1"], "auc_delta": delta["AUC"]})
+        flag = "  <-- cek" if max(abs(v) for v in delta.values()) > 0.005 else ""
+        print(f"{'':>14} {'':>10} {'float32':<10} {name:<22} dF1={delta['F1']:+.4f} dAUC={delta['AUC']:+.4f}{flag}")
+
+    fingerprint = dataset_fingerprint(X, y)
+
+    def compare():
+        run = TrainingRun(X_train, X_test, y_train, y_test, fingerprint, cache=TrainingCache(), meta=pack["meta"])
+        return run.compare(models, n_jobs=n_jobs)
+
+    bench.record(label, n_train, "compare", f"{len(models)} model", compare, n_jobs=n_jobs)
+
+    def racing():
+        run = TrainingRun(X_train, X_test, y_train, y_test, fingerprint, cache=TrainingCache(), meta=pack["meta"])
+        return race(run, models)
+
+    outcome = bench.record(label, n_train, "compare", "racing", racing)
+    bench.results[-1]["rows_saved"] = 1 - outcome["rows_used"] / outcome["rows_exhaustive"]
+
+    def stream():
+        # out-of-core: seluruh file (tanpa subsample), memori = satu chunk
+        run = StreamingRun(csv_path, content_hash(csv_path), pack["meta"], list(pack["X"].columns))
+        return run.compare()
+
+    bench.record(label, n, "stream", "partial_fit (3 model)", stream)
+
+    # payload chart: ROC model terakhir (test set) + histogram fitur pertama per kelas (semua baris)
+    fpr, tpr, _ = roc_points(y_test, proba[:, 1])
+    roc_df = bench.record(label, n_test, "chart", "roc_frame", lambda: roc_frame(fpr, tpr))
+    bench.results[-1].update({"points_in": len(fpr), "points_out": len(roc_df)})
+    hist = bench.record(label, n, "chart", "histogram_counts",
+                        lambda: histogram_counts(pack["X"].iloc[:, 0], pack["y"].to_numpy()))
+    bench.results[-1]["points_out"] = len(hist)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare_with(baseline_path: str, results: list):
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    index = {(r["dataset"], r["rows"], r["stage"], r["name"]): r["seconds"] for r in base}
+    print("\nPerbandingan dengan baseline (rasio > 1 = lebih lambat):")
+    for r in results:
+        old = index.get((r["dataset"], r["rows"], r["stage"], r["name"]))
+        if old:
+            print(f"{r['dataset']:>14} {r['stage']:<10} {r['name']:<22} {r['seconds'] / old:6.2f}x")
+
+
+# =========================================================
+# SELF-CHECK (INVARIAN KOREKTNESS, JALANKAN DENGAN --check)
+# =========================================================
+CHECKS = []
+
+
+def _check(fn):
+    CHECKS.append(fn)
+    return fn
+
+
+@_check
+def check_compressed_upload():
+    # upload .gz / .zst (BytesIO seperti Streamlit) tetap terbuka setelah sniff header + baca typed
+    raw = make_ispu(2_000).to_csv(index=False).encode()
+    codecs = {"gz": gzip.compress(raw)}
+    if ingest.pa is not None:
+        buf = ingest.pa.BufferOutputStream()
+        with ingest.pa.CompressedOutputStream(buf, "zstd") as out:
+            out.write(raw)
+        codecs["zst"] = buf.getvalue().to_pybytes()
+    for ext, data in codecs.items():
+        for engine in ("pyarrow", "pandas") if ingest.pa is not None else ("pandas",):
+            upload = io.BytesIO(data)
+            upload.name = f"ispu.csv.{ext}"
+            header = ingest.sniff_header(upload)
+            dtypes = {c: COLUMN_DTYPES[c.lower()] for c in header if c.lower() in COLUMN_DTYPES}
+            for _ in range(2):
+                rows = sum(len(c) for c in ingest.iter_csv_typed(upload, dtype=dtypes, engine=engine))
+                assert rows == 2_000, (ext, engine, rows)
+            assert not upload.closed, (ext, engine)
+
+
+@_check
+def check_tree_scorer_routing():
+    # compiled tree scorer hanya untuk batch kecil (latensi); batch besar diteruskan ke sklearn.
+    # keputusan routing yang diperiksa, bukan waktu (waktu tetap dilaporkan di tahap "score")
+    X, y = make_classification(60_000, n_features=10, random_state=0)
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(10)])
+    for mdl in (RandomForestClassifier(n_estimators=100, random_state=0, n_jobs=-1),
+                DecisionTreeClassifier(random_state=0)):
+        pipe = Pipeline([("scaler", StandardScaler()), ("model", mdl)]).fit(X[:10_000], y[:10_000])
+        scorer, report = compile_verified(pipe, X.head(512))
+        assert report is not None and report["ok"], (type(mdl).__name__, report)
+        assert isinstance(scorer, RoutedScorer), type(scorer).__name__
+        assert scorer._route(X.head(1)) is scorer.compiled, type(mdl).__name__
+        assert scorer._route(X.head(50_000)) is scorer.fallback, type(mdl).__name__
+
+
+@_check
+def check_stream_naive_bayes_single_pass():
+    # GaussianNB out-of-core melihat setiap baris training tepat sekali (bukan sekali per epoch)
+    with tempfile.TemporaryDirectory(prefix="check_") as folder:
+        path = os.path.join(folder, "ispu.csv")
+        make_ispu(30_000).to_csv(path, index=False)
+        pack = _prep_environment(pd.read_csv(path))
+        run = StreamingRun(path, content_hash(path), pack["meta"], list(pack["X"].columns),
+                           chunksize=10_000, cache=TrainingCache())
+        n_train = sum(int((~holdout).sum()) for _, _, holdout in run._chunks())
+        entries = run.compare()
+        nb = entries["Naive Bayes (stream)"]["model"].named_steps["model"]
+        assert nb.class_count_.sum() == n_train, (nb.class_count_.sum(), n_train)
+        sgd = entries["SGD Logistic (stream)"]["model"].named_steps["model"]
+        assert sgd.t_ - 1 == n_train * run.epochs, (sgd.t_, n_train)
+
+
+@_check
+def check_operating_point_metrics():
+    # metrik baris sweep yang ditampilkan = metrik prediksi (proba >= threshold yang disimpan)
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 3_000)
+    proba = np.round(np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1), 2)  # banyak tie
+    sweep = threshold_sweep(y, proba, cost_fp=1.0, cost_fn=5.0)
+    cases = [("f1", {}), ("recall", {"recall_target": 0.9}), ("cost", {}), ("default", {})]
+    cases += [("manual", {"manual": t}) for t in (0.0, 0.3, 0.355, float(proba[7]), proba.max(), 1.0)]
+    for strategy, kwargs in cases:
+        t, idx = operating_point(sweep, strategy, **kwargs)
+        expected = binary_metrics(y, (proba >= t).astype(int), proba)
+        for k in ("Accuracy", "Precision", "Recall", "F1"):
+            assert np.isclose(sweep[k][idx], expected[k]), (strategy, kwargs, k, sweep[k][idx], expected[k])
+
+
+@_check
+def check_single_sort_auc():
+    # AUC trapesium dari kurva satu sort = AUC Mann-Whitney (rank rata-rata untuk tie)
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 5_000)
+    proba = np.round(rng.random(5_000) * (0.5 + 0.5 * y), 2)
+    y_pred = (proba >= 0.4).astype(int)
+    report = binary_report(y, y_pred, proba)
+    reference = evaluate_models(y, {"m": proba}, {"m": y_pred}, n_boot=0)["m"]["metrics"]
+    for k, v in reference.items():
+        assert np.isclose(report["metrics"][k], v), (k, report["metrics"][k], v)
+    fpr, tpr, _ = roc_from_curve(report["curve"])
+    assert np.isclose(np.trapezoid(tpr, fpr), reference["AUC"])
+
+
+def run_checks() -> bool:
+    ok = True
+    for fn in CHECKS:
+        try:
+            fn()
+            print(f"OK    {fn.__name__}")
+        except Exception as exc:
+            ok = False
+            print(f"GAGAL {fn.__name__}: {exc!r}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading, training & inference (tanpa Streamlit).")
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="jumlah baris ISPU sintetis, dipisah koma (mis. 10000,1000000,10000000)")
+    parser.add_argument("--max-train-rows", type=int, default=200_000,
+                        help="batas baris untuk fit model (subsample terstratifikasi)")
+    parser.add_argument("--skip-models", default="", help="nama model dipisah koma, mis. 'SVM,KNN'")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--repeat", type=int, default=1, help="ulangi tiap pengukuran, ambil tercepat")
+    parser.add_argument("--no-health", action="store_true", help="lewati data/BreastCancer.csv")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="file JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument("--check", action="store_true", help="hanya jalankan self-check korektness")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if run_checks() else 1)
+
+    warnings.simplefilter("ignore", FutureWarning)
+    skip = {s.strip() for s in args.skip_models.split(",") if s.strip()}
+    bench = Bench(repeat=args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as folder:
+        # cache dataset di folder sementara agar cache milik dashboard tidak terhapus
+        default_dataset_cache().root = os.path.join(folder, "datasets")
+
+        if not args.no_health:
+            bench_dataset(bench, "breast_cancer", HEALTH_CSV, _prep_health, "health",
+                          args.max_train_rows, skip, args.n_jobs)
+
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            path = os.path.join(folder, f"ispu_{size}.csv")
+            make_ispu(size).to_csv(path, index=False)
+            bench_dataset(bench, "ispu_synthetic", path, _prep_environment, "environment",
+                          args.max_train_rows, skip, args.n_jobs)
+            os.remove(path)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "args": vars(args),
+        },
+        "results": bench.results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {args.out}")
+
+    if args.baseline:
+        _compare_with(args.baseline, bench.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+
+# batas titik per kurva / bin per histogram yang dikirim ke browser
+CURVE_MAX_POINTS = 1_000
+HIST_MAX_BINS = 60
+# outlier boxplot yang digambar per kelas (sampel; ekstrem min/max selalu ikut)
+BOX_MAX_OUTLIERS = 200
+
+
+# =========================================================
+# DECIMASI KURVA (ROC / THRESHOLD SWEEP)
+# =========================================================
+def decimate_curve(df: pd.DataFrame, columns: list, max_points: int = CURVE_MAX_POINTS) -> pd.DataFrame:
+    # Titik dipilih per panjang lintasan L1 (tiap kolom dinormalisasi ke rentangnya): satu titik per
+    # 1/max_points lintasan. Antara dua titik tersisa kurva tidak bisa menyimpang lebih dari
+    # 1/max_points tinggi/lebar plot (< 1 px pada chart biasa) -> tampak identik.
+    # Nilai turunan (AUC dll.) tetap dihitung dari array penuh, bukan dari titik ini.
+    if len(df) <= max_points:
+        return df
+    values = df[columns].to_numpy(dtype=np.float64)
+    span = np.ptp(values, axis=0)
+    steps = np.abs(np.diff(values, axis=0)) / np.where(span > 0, span, 1.0)
+    arc = np.r_[0.0, np.cumsum(steps.sum(axis=1))]
+    bucket = np.floor(arc / max(arc[-1], 1e-12) * (max_points - 1)).astype(np.int64)
+    # titik pertama tiap bucket + titik terakhir kurva
+    keep = np.r_[True, bucket[1:] != bucket[:-1]]
+    keep[-1] = True
+    return df.iloc[np.flatnonzero(keep)]
+
+
+def roc_frame(fpr, tpr, max_points: int = CURVE_MAX_POINTS) -> pd.DataFrame:
+    roc_df = pd.DataFrame({"False Positive Rate": fpr, "True Positive Rate": tpr})
+    # titik segaris (tie skor satu kelas) tidak mengubah kurva -> dibuang dulu, tanpa aproksimasi
+    d = np.diff(roc_df.to_numpy(), axis=0)
+    turn = np.r_[True, d[1:, 0] * d[:-1, 1] != d[1:, 1] * d[:-1, 0], True]
+    return decimate_curve(roc_df[turn], list(roc_df.columns), max_points)
+
+
+# =========================================================
+# HISTOGRAM PRE-BINNED (HITUNG DI SERVER, KIRIM JUMLAH PER BIN)
+# =========================================================
+def histogram_counts(values, groups=None, max_bins: int = HIST_MAX_BINS) -> pd.DataFrame:
+    # bin yang sama untuk semua kelompok -> (bin_left, bin_right, group, count), ukuran tidak
+    # bergantung pada jumlah baris
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups)
+    ok = np.isfinite(values)
+    values, groups = values[ok], groups[ok]
+    if len(values) == 0:
+        return pd.DataFrame(columns=["bin_left", "bin_right", "group", "count"])
+
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        edges = np.array([lo - 0.5, hi + 0.5])
+    else:
+        edges = np.histogram_bin_edges(values, bins="auto", range=(lo, hi))
+        if len(edges) - 1 > max_bins:
+            edges = np.linspace(lo, hi, max_bins + 1)
+    n_bins = len(edges) - 1
+    # bin terakhir tertutup di kanan seperti np.histogram
+    idx = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, n_bins - 1)
+
+    labels, codes = np.unique(groups, return_inverse=True)
+    counts = np.bincount(codes * n_bins + idx, minlength=len(labels) * n_bins).reshape(len(labels), n_bins)
+    return pd.DataFrame({
+        "bin_left": np.tile(edges[:-1], len(labels)),
+        "bin_right": np.tile(edges[1:], len(labels)),
+        "group": np.repeat(labels, n_bins),
+        "count": counts.ravel(),
+    })
+
+
+def category_counts(values) -> pd.DataFrame:
+    # pengganti px.histogram untuk kolom diskrit (mis. distribusi kelas)
+    labels, counts = np.unique(np.asarray(values), return_counts=True)
+    return pd.DataFrame({"value": labels, "count": counts})
+
+
+# =========================================================
+# STATISTIK BOXPLOT (KUARTIL, WHISKER TUKEY, SAMPEL OUTLIER)
+# =========================================================
+def box_stats(values, groups=None, max_outliers: int = BOX_MAX_OUTLIERS, seed: int = 42) -> list:
+    # kuartil interpolasi linear (np.quantile, quartilemethod default Plotly); whisker = nilai terjauh di dalam
+    # 1.5 x IQR dari Q1/Q3; outlier disampling -> ukuran tetap berapa pun jumlah barisnya
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups)
+    ok = np.isfinite(values)
+    values, groups = values[ok], groups[ok]
+    rng = np.random.default_rng(seed)
+
+    out = []
+    labels, codes = np.unique(groups, return_inverse=True)
+    for i, label in enumerate(labels):
+        v = values[codes == i]
+        q1, median, q3 = np.quantile(v, [0.25, 0.5, 0.75])
+        lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = (v >= lo) & (v <= hi)
+        outliers = v[~inside]
+        if len(outliers) > max_outliers:
+            pick = rng.choice(len(outliers), size=max_outliers - 2, replace=False)
+            outliers = np.r_[outliers.min(), outliers[pick], outliers.max()]
+        out.append({
+            "group": label,
+            "n": len(v),
+            "q1": q1, "median": median, "q3": q3,
+            "lowerfence": v[inside].min(), "upperfence": v[inside].max(),
+            "mean": v.mean(),
+            "n_outliers": int((~inside).sum()),
+            "outliers": outliers,
+        })
+    return out
@@ -1,12 +1,49 @@
+import hashlib
+import time
+
 import pandas as pd
 import numpy as np
 import streamlit as st
 
+import ingest
+from dataset_cache import content_hash, default_dataset_cache, df_view
+from profiling import span
+
 HEALTH_LINK = "https://github.com/advikmaniar/ML-Healthcare-Web-App/tree/main/Data"
 ENV_LINK = "https://github.com/ryanjiroo/Forecasting-Kualitas-Udara-Jakarta/tree/main/data"
 
-def _detect_dataset(df: pd.DataFrame) -> str:
-    cols = set([c.lower() for c in df.columns])
+# naikkan bila logika _prep_health / _prep_environment berubah (invalidasi cache dataset di disk)
+PREPARER_VERSION = 2
+
+# dtype eksplisit untuk kolom yang dikenal (sisanya diinferensi engine);
+# label & stasiun sebagai category agar tidak jadi kolom object besar
+COLUMN_DTYPES = {
+    "diagnosis": "category",
+    "stasiun": "category",
+    "station": "category",
+    "categori": "category",
+    "kategori": "category",
+    "critical": "category",
+    "pm10": "float64",
+    "pm25": "float64",
+    "so2": "float64",
+    "co": "float64",
+    "o3": "float64",
+    "no2": "float64",
+    "max": "float64",
+}
+
+# kolom yang dibaca _prep_environment (nama sudah di-strip + lowercase)
+ENV_TARGETS = ["categori", "kategori", "category", "label"]
+ENV_NUMERIC = ["pm10", "pm25", "so2", "co", "o3", "no2", "max"]
+ENV_STATIONS = ["stasiun", "station"]
+# label ISPU -> AMAN (1) / TIDAK AMAN (0); label lain dibuang
+SAFE_LABELS = {"BAIK", "SEDANG"}  # kamu bisa sesuaikan jika dosen punya definisi lain
+UNSAFE_LABELS = {"TIDAK SEHAT", "SANGAT TIDAK SEHAT", "BERBAHAYA"}
+
+def _detect_dataset(columns) -> str:
+    # cukup nama kolom (header), tidak perlu isi file
+    cols = set([c.strip().lower() for c in columns])
     if "diagnosis" in cols:
         return "health"
     if "categori" in cols or "kategori" in cols or "ispu" in cols or "pm10" in cols:
@@ -15,14 +52,16 @@ def _detect_dataset(df: pd.DataFrame) -> str:
 
 def _prep_health(df: pd.DataFrame) -> dict:
     # diagnosis: 'M'/'B' -> 1/0
-    df = df.copy()
+    # shallow copy: copy-on-write, kolom baru tidak mengubah frame hasil parse
+    df = df.copy(deep=False)
     df.columns = [c.strip() for c in df.columns]
 
     if "diagnosis" not in df.columns:
         raise ValueError("Kolom 'diagnosis' tidak ditemukan untuk dataset kesehatan.")
 
     # map diagnosis
-    df["diagnosis"] = df["diagnosis"].map({"M": 1, "B": 0}).fillna(df["diagnosis"])
+    diagnosis = df["diagnosis"].astype(str)
+    df["diagnosis"] = diagnosis.map({"M": 1, "B": 0}).fillna(diagnosis)
 
     # drop id if exists
     if "id" in df.columns:
@@ -43,30 +82,32 @@ def _prep_health(df: pd.DataFrame) -> dict:
         "target_col": "diagnosis",
         "positive_label": "Malignant (Ganas)",
         "negative_label": "Benign (Jinak)",
-        "dataset_link": HEALTH_LINK
+        "dataset_link": HEALTH_LINK,
+        "numeric_features": list(X.columns),
+        "categorical_col": None,
+        "categorical_features": [],
+        # dipakai untuk mengisi nilai kosong saat prediksi batch
+        "fill_values": {c: float(v) for c, v in X.median().items()}
     }
     return {"df": df, "X": X, "y": y, "meta": meta}
 
 def _prep_environment(df: pd.DataFrame) -> dict:
-    df = df.copy()
+    df = df.copy(deep=False)
     df.columns = [c.strip() for c in df.columns]
 
     # target bisa "categori" (sesuai file yang umum)
-    target_candidates = [c for c in df.columns if c.lower() in ["categori", "kategori", "category", "label"]]
+    target_candidates = [c for c in df.columns if c.lower() in ENV_TARGETS]
     if not target_candidates:
         raise ValueError("Kolom kategori (mis. 'categori') tidak ditemukan untuk dataset lingkungan.")
     target_col = target_candidates[0]
 
     # convert label -> binary AMAN
-    safe_labels = {"BAIK", "SEDANG"}  # kamu bisa sesuaikan jika dosen punya definisi lain
-    unsafe_labels = {"TIDAK SEHAT", "SANGAT TIDAK SEHAT", "BERBAHAYA"}
-
     df[target_col] = df[target_col].astype(str).str.upper().str.strip()
 
     def to_binary(label: str) -> int:
-        if label in safe_labels:
+        if label in SAFE_LABELS:
             return 1  # AMAN
-        if label in unsafe_labels:
+        if label in UNSAFE_LABELS:
             return 0  # TIDAK AMAN
         # kalau label lain/unknown -> anggap aman? lebih aman: jadikan NaN lalu drop
         return np.nan
@@ -76,29 +117,33 @@ def _prep_environment(df: pd.DataFrame) -> dict:
 
     # pilih fitur numerik utama
     # biasanya: pm10, pm25, so2, co, o3, no2, max
-    numeric_candidates = ["pm10", "pm25", "so2", "co", "o3", "no2", "max"]
     cols_lower = {c.lower(): c for c in df.columns}
-    feature_cols = [cols_lower[c] for c in numeric_candidates if c in cols_lower]
+    feature_cols = [cols_lower[c] for c in ENV_NUMERIC if c in cols_lower]
 
     # tambah 'stasiun' sebagai kategori bila ada
     station_col = None
     for c in df.columns:
-        if c.lower() in ["stasiun", "station"]:
+        if c.lower() in ENV_STATIONS:
             station_col = c
             break
 
     use_cols = feature_cols + ([station_col] if station_col else [])
-    sub = df[use_cols + ["target_aman"]].copy()
+    sub = df[use_cols + ["target_aman"]]
 
     # numeric convert + impute median
+    fill_values = {}
     for c in feature_cols:
         sub[c] = pd.to_numeric(sub[c], errors="coerce")
-        sub[c] = sub[c].fillna(sub[c].median())
+        fill_values[c] = float(sub[c].median())
+        sub[c] = sub[c].fillna(fill_values[c])
 
-    # one-hot for station
+    # one-hot for station (sparse: hanya posisi bernilai 1 yang disimpan)
+    categorical_features = []
     if station_col:
         sub[station_col] = sub[station_col].astype(str)
-        sub = pd.get_dummies(sub, columns=[station_col], drop_first=True)
+        before = set(sub.columns)
+        sub = pd.get_dummies(sub, columns=[station_col], drop_first=True, dtype=float, sparse=True)
+        categorical_features = [c for c in sub.columns if c not in before]
 
     X = sub.drop(columns=["target_aman"])
     y = sub["target_aman"].astype(int)
@@ -109,29 +154,144 @@ def _prep_environment(df: pd.DataFrame) -> dict:
         "positive_label": "AMAN",
         "negative_label": "TIDAK AMAN",
         "dataset_link": ENV_LINK,
-        "original_label_col": target_col
+        "original_label_col": target_col,
+        "numeric_features": feature_cols,
+        "categorical_col": station_col,
+        # kolom dummy (sparse) -> tidak di-scale, tetap sparse sampai ke estimator
+        "categorical_features": categorical_features,
+        "fill_values": fill_values
     }
     return {"df": sub, "X": X, "y": y, "meta": meta}
 
-@st.cache_data
-def load_and_prepare(uploaded_file, dataset_mode: str):
+def prepare_features(df: pd.DataFrame, meta: dict, feature_names: list) -> pd.DataFrame:
+    # preprocessing yang sama dengan _prep_health / _prep_environment,
+    # tanpa target (untuk data baru yang akan diprediksi)
+    df = df.copy()
+    df.columns = [c.strip() for c in df.columns]
+
+    numeric = [c for c in meta.get("numeric_features", []) if c in df.columns]
+    for c in numeric:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    station_col = meta.get("categorical_col")
+    if station_col and station_col in df.columns:
+        df[station_col] = df[station_col].astype(str)
+        df = pd.get_dummies(df, columns=[station_col])
+
+    # nilai kosong -> median training (numerik) / 0 (dummy stasiun)
+    X = df.reindex(columns=feature_names).astype(float)
+    fill = {c: 0.0 for c in feature_names}
+    fill.update(meta.get("fill_values", {}))
+    return X.fillna(fill)
+
+def prepare_labeled(df: pd.DataFrame, meta: dict, feature_names: list):
+    # versi per chunk (training out-of-core): fitur seperti prepare_features + target;
+    # baris dengan label tidak dikenal dibuang seperti di _prep_health / _prep_environment
+    df = df.copy(deep=False)
+    df.columns = [c.strip() for c in df.columns]
+    if meta["dataset_type"] == "health":
+        y = df["diagnosis"].astype(str).str.strip().map({"M": 1, "B": 0})
+    else:
+        labels = {**{l: 1 for l in SAFE_LABELS}, **{l: 0 for l in UNSAFE_LABELS}}
+        y = df[meta["original_label_col"]].astype(str).str.upper().str.strip().map(labels)
+    keep = y.notna().to_numpy()
+    X = prepare_features(df[keep], meta, feature_names)
+    return X, y[keep].astype(int)
+
+def _columns_for(dataset_type: str, header: list) -> list:
+    # projection: hanya kolom yang dipakai preparer (urutan mengikuti header)
+    if dataset_type == "health":
+        return [c for c in header if c.strip().lower() != "id"]
+    wanted = set(ENV_TARGETS + ENV_NUMERIC + ENV_STATIONS)
+    return [c for c in header if c.strip().lower() in wanted]
+
+def compact_frame(X: pd.DataFrame) -> pd.DataFrame:
+    # float32, kolom sparse tetap sparse
+    return X.astype({
+        c: pd.SparseDtype(np.float32, 0) if isinstance(t, pd.SparseDtype) else np.float32
+        for c, t in X.dtypes.items()
+    })
+
+def compact_pack(pack: dict) -> dict:
+    # representasi hemat: fitur float32, target int8, df = view X + target
+    X = compact_frame(pack["X"])
+    y = pack["y"].astype(np.int8)
+    pos = pack["df"].columns.get_loc(y.name) if y.name in pack["df"].columns else len(X.columns)
+    out = dict(pack)
+    out.update({"X": X, "y": y, "df": df_view(X, y, pos)})
+    out["meta"] = dict(pack["meta"], compact=True)
+    return out
+
+def _parse_and_prepare(uploaded_file, dataset_type: str) -> dict:
+    header = ingest.sniff_header(uploaded_file)
+    usecols = _columns_for(dataset_type, header)
+    dtypes = {c: COLUMN_DTYPES[c.strip().lower()] for c in usecols if c.strip().lower() in COLUMN_DTYPES}
+
+    with span("parse CSV"):
+        df, ingest_stats = ingest.read_csv(uploaded_file, dtype=dtypes, usecols=usecols)
+    ingest_stats["columns"] = len(usecols)
+    ingest_stats["header_columns"] = len(header)
+
+    if dataset_type == "health":
+        with span("preprocessing (health)"):
+            pack = _prep_health(df)
+    else:
+        with span("preprocessing (environment)"):
+            pack = _prep_environment(df)
+    pack["ingest"] = ingest_stats
+    return pack
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_cached(key: str, _uploaded_file, dataset_type: str, compact: bool = False,
+                 fingerprint: str = None) -> dict:
+    # key = hash isi file + tipe + PREPARER_VERSION; file tidak ikut di-hash Streamlit
+    cache = default_dataset_cache()
+    t0 = time.perf_counter()
+    with span("buka cache dataset (disk)"):
+        pack = cache.load(key)
+    if pack is not None:
+        pack["source"] = {"kind": "disk", "seconds": time.perf_counter() - t0}
+    else:
+        pack = _parse_and_prepare(_uploaded_file, dataset_type)
+        if compact:
+            pack = compact_pack(pack)
+        with span("simpan cache dataset (disk)"):
+            cache.save(key, pack)
+            # buka lagi dari disk agar representasi sama dengan run berikutnya (memmap)
+            pack = cache.load(key) or pack
+        pack["source"] = {"kind": "parse", "seconds": time.perf_counter() - t0}
+    # identitas dataset untuk training cache / registry: dihitung sekali per pack, bukan per rerun
+    pack["meta"]["fingerprint"] = fingerprint
+    return pack
+
+def _fingerprint(file_hash: str, variant: str) -> str:
+    # fingerprint dataset terproses = isi file + varian (tipe, float32) + versi preparer
+    raw = f"{file_hash}|{variant}|{PREPARER_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+def load_dataset(uploaded_file, dataset_type: str, compact: bool = False) -> dict:
+    # cache per (isi file, tipe dataset): ganti mode sidebar ke tipe yang sama tidak parse ulang,
+    # server yang di-restart membuka dataset yang sama dari disk
+    with span("hash isi file"):
+        file_hash = content_hash(uploaded_file)
+    variant = f"{dataset_type}/float32" if compact else dataset_type
+    key = default_dataset_cache().key(file_hash, variant, PREPARER_VERSION)
+    return _load_cached(key, uploaded_file, dataset_type, compact, _fingerprint(file_hash, variant))
+
+def load_and_prepare(uploaded_file, dataset_mode: str, compact: bool = False):
     if uploaded_file is None:
         return None
 
-    df = pd.read_csv(uploaded_file)
-
-    # tentukan tipe dataset
+    # tentukan tipe dataset dulu (dari mode atau header), baru parse
     if dataset_mode == "Kesehatan (Breast Cancer)":
         dtype = "health"
     elif dataset_mode == "Lingkungan (ISPU Udara)":
         dtype = "environment"
     else:
-        dtype = _detect_dataset(df)
-
-    if dtype == "health":
-        return _prep_health(df)
+        with span("sniff header"):
+            dtype = _detect_dataset(ingest.sniff_header(uploaded_file))
 
-    if dtype == "environment":
-        return _prep_environment(df)
+    if dtype in ("health", "environment"):
+        return load_dataset(uploaded_file, dtype, compact)
 
     return {"error": "Dataset tidak dikenali. Pastikan kolom 'diagnosis' (kesehatan) atau 'categori' (lingkungan) ada."}
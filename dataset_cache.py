@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+DATASET_CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join(".cache", "datasets"))
+HASH_BLOCK = 1 << 20
+# naikkan bila layout file cache berubah
+FORMAT_VERSION = 3
+
+# hash per upload (file_id) / path (ukuran + mtime) agar rerun tidak membaca ulang file
+_hashes = {}
+_hash_lock = threading.Lock()
+
+
+# =========================================================
+# HASH ISI FILE (INKREMENTAL, PER BLOK)
+# =========================================================
+def _memo_key(source):
+    if isinstance(source, (str, os.PathLike)):
+        st = os.stat(source)
+        return ("path", os.path.abspath(source), st.st_size, st.st_mtime_ns)
+    file_id = getattr(source, "file_id", None)
+    return ("upload", file_id) if file_id else None
+
+
+def content_hash(source) -> str:
+    memo = _memo_key(source)
+    with _hash_lock:
+        if memo is not None and memo in _hashes:
+            return _hashes[memo]
+
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                h.update(block)
+    elif hasattr(source, "getbuffer"):
+        buf = source.getbuffer()
+        for i in range(0, buf.nbytes, HASH_BLOCK):
+            h.update(buf[i:i + HASH_BLOCK])
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            h.update(block)
+        source.seek(0)
+
+    digest = h.hexdigest()
+    if memo is not None:
+        with _hash_lock:
+            _hashes[memo] = digest
+    return digest
+
+
+# =========================================================
+# DF = X + KOLOM TARGET (VIEW, TANPA SALINAN)
+# =========================================================
+def df_view(X: pd.DataFrame, y: pd.Series, target_pos: int) -> pd.DataFrame:
+    # shallow copy (copy-on-write): blok fitur tetap milik X, hanya target yang ditambah
+    df = X.copy(deep=False)
+    df.insert(target_pos, y.name, y)
+    return df
+
+
+def _target_pos(pack: dict):
+    df, X, y = pack["df"], pack["X"], pack["y"]
+    if y.name not in df.columns or [c for c in df.columns if c != y.name] != list(X.columns):
+        return None
+    return df.columns.get_loc(y.name)
+
+
+# =========================================================
+# CACHE PACK TERPROSES (NPY MEMMAP, KOLUMNAR PER DTYPE)
+# =========================================================
+# Layout per key:
+#   <key>/X.npy       -> kolom fitur dense (float64 / float32 compact), dibuka memmap read-only
+#   <key>/X_sparse.npz -> kolom fitur sparse (dummy kategori), CSC
+#   <key>/y.npy, index.npy
+#   <key>/meta.json   -> meta + nama kolom + posisi target; ditulis terakhir = penanda lengkap
+# df tidak disimpan terpisah: df = X + kolom target, dibangun ulang sebagai view.
+class DatasetCache:
+    def __init__(self, root: str = DATASET_CACHE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(file_hash: str, dataset_type: str, version: int) -> str:
+        raw = f"{file_hash}|{dataset_type}|{version}|{FORMAT_VERSION}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(self, key: str):
+        folder = os.path.join(self.root, key)
+        if not os.path.exists(os.path.join(folder, "meta.json")):
+            self._count(False)
+            return None
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+                info = json.load(f)
+            index = pd.Index(np.load(os.path.join(folder, "index.npy")))
+            X = pd.DataFrame(
+                np.load(os.path.join(folder, "X.npy"), mmap_mode="r"),
+                index=index, columns=info["dense_columns"], copy=False,
+            )
+            if info["sparse_columns"]:
+                m = sparse.load_npz(os.path.join(folder, "X_sparse.npz"))
+                # from_spmatrix memberi fill NaN -> kembalikan fill 0 seperti get_dummies
+                Xs = pd.DataFrame.sparse.from_spmatrix(
+                    m, index=index, columns=info["sparse_columns"],
+                ).astype(pd.SparseDtype(m.dtype, 0))
+                X = pd.concat([X, Xs], axis=1)
+                if list(X.columns) != info["x_columns"]:
+                    X = X[info["x_columns"]]
+            y = pd.Series(np.load(os.path.join(folder, "y.npy"), mmap_mode="r"),
+                          index=index, name=info["y_name"], copy=False)
+            df = df_view(X, y, info["target_pos"])
+        except (OSError, ValueError, KeyError):
+            self._count(False)
+            return None
+        self._count(True)
+        return {
+            "df": df,
+            "X": X,
+            "y": y,
+            "meta": info["meta"],
+            "ingest": info.get("ingest"),
+        }
+
+    def save(self, key: str, pack: dict):
+        target_pos = _target_pos(pack)
+        if target_pos is None:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.root, suffix=".tmp")
+        try:
+            X, y = pack["X"], pack["y"]
+            sparse_cols = [c for c, t in X.dtypes.items() if isinstance(t, pd.SparseDtype)]
+            dense_cols = [c for c in X.columns if c not in sparse_cols]
+            dense = X[dense_cols]
+            dtype = np.result_type(*dense.dtypes) if dense_cols else np.float64
+            np.save(os.path.join(tmp, "X.npy"), np.ascontiguousarray(dense.to_numpy(dtype=dtype)))
+            if sparse_cols:
+                sparse.save_npz(os.path.join(tmp, "X_sparse.npz"),
+                                X[sparse_cols].sparse.to_coo().tocsc(), compressed=False)
+            np.save(os.path.join(tmp, "y.npy"), y.to_numpy())
+            np.save(os.path.join(tmp, "index.npy"), X.index.to_numpy())
+            info = {
+                "x_columns": [str(c) for c in X.columns],
+                "dense_columns": [str(c) for c in dense_cols],
+                "sparse_columns": [str(c) for c in sparse_cols],
+                "y_name": y.name,
+                "target_pos": int(target_pos),
+                "meta": pack["meta"],
+                "ingest": pack.get("ingest"),
+            }
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(tmp, os.path.join(self.root, key))
+        except OSError:
+            # key sudah ditulis proses lain -> pakai yang ada
+            pass
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+_default = None
+
+
+def default_dataset_cache() -> DatasetCache:
+    global _default
+    if _default is None:
+        _default = DatasetCache()
+    return _default
@@ -0,0 +1,285 @@
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+
+from scipy import sparse
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.pipeline import make_pipeline
+from sklearn.svm import SVC, LinearSVC
+
+
+# di atas jumlah baris training ini SVC kernel eksak (O(n²)–O(n³) + Platt 5-fold) diganti
+SVM_EXACT_MAX_ROWS = 10_000
+# mode KNN "auto": di atas ini indeks IVF (aproksimasi) menggantikan KD/ball tree eksak
+KNN_EXACT_MAX_ROWS = 100_000
+KNN_MODES = ("auto", "exact", "ivf")
+# di atas ini GradientBoosting (split eksak, 1 thread) diganti versi histogram
+GB_EXACT_MAX_ROWS = 10_000
+
+
+def _dense(X) -> np.ndarray:
+    if sparse.issparse(X):
+        X = X.toarray()
+    return np.ascontiguousarray(X, dtype=np.float64)
+
+
+# =========================================================
+# SVM SKALABEL (NYSTROEM / LINEAR + PLATT SEKALI DI HOLDOUT)
+# =========================================================
+class ScalableSVC(ClassifierMixin, BaseEstimator):
+    def __init__(self, kernel: str = "rbf", C: float = 1.0, gamma="scale", n_components: int = 500,
+                 calibration_size: float = 0.2, random_state: int = 42):
+        self.kernel = kernel
+        self.C = C
+        self.gamma = gamma
+        self.n_components = n_components
+        self.calibration_size = calibration_size
+        self.random_state = random_state
+
+    def _gamma(self, X) -> float:
+        if self.gamma != "scale":
+            return float(self.gamma)
+        # sama dengan SVC(gamma="scale"): 1 / (n_features * X.var())
+        if sparse.issparse(X):
+            mean = X.mean()
+            var = X.multiply(X).mean() - mean ** 2
+        else:
+            var = np.asarray(X).var()
+        return 1.0 / (X.shape[1] * var) if var > 0 else 1.0
+
+    def _svm(self, X):
+        svm = LinearSVC(C=self.C, dual="auto", random_state=self.random_state)
+        if self.kernel == "linear":
+            return svm
+        n_components = min(self.n_components, X.shape[0])
+        return make_pipeline(
+            Nystroem(kernel=self.kernel, gamma=self._gamma(X), n_components=n_components,
+                     random_state=self.random_state),
+            svm,
+        )
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        X_fit, X_cal, y_fit, y_cal = train_test_split(
+            X, y, test_size=self.calibration_size, random_state=self.random_state, stratify=y
+        )
+        self.svm_ = self._svm(X_fit).fit(X_fit, y_fit)
+        # Platt scaling satu kali pada skor holdout (bukan 5-fold seperti SVC(probability=True))
+        scores = self.svm_.decision_function(X_cal).reshape(-1, 1)
+        self.calibrator_ = LogisticRegression().fit(scores, y_cal)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def decision_function(self, X):
+        return self.svm_.decision_function(X)
+
+    def predict_proba(self, X):
+        return self.calibrator_.predict_proba(self.decision_function(X).reshape(-1, 1))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def make_svm(n_rows: int = None):
+    # kecil: SVC eksak; besar: aproksimasi kernel + SVM linear
+    if n_rows is not None and n_rows > SVM_EXACT_MAX_ROWS:
+        return ScalableSVC()
+    return SVC(probability=True)
+
+
+# =========================================================
+# KNN BERINDEKS (INDEKS DIBANGUN SEKALI SAAT FIT, QUERY MULTI-CORE)
+# =========================================================
+# mode="exact": KD/ball tree sklearn di atas data dense (CSR dummy memaksa brute force)
+# mode="ivf"  : inverted file — k-means membagi data ke n_lists cluster, query hanya
+#               memeriksa n_probe cluster terdekat (n_probe besar = recall naik, lebih lambat)
+# Indeks ikut ter-pickle bersama pipeline, jadi artefak registry memuatnya tanpa build ulang.
+class IndexedKNN(ClassifierMixin, BaseEstimator):
+    def __init__(self, n_neighbors: int = 5, mode: str = "exact", n_lists="auto", n_probe: int = 8,
+                 batch_size: int = 2048, n_jobs: int = -1, recall_sample: int = 500,
+                 random_state: int = 42):
+        self.n_neighbors = n_neighbors
+        self.mode = mode
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.recall_sample = recall_sample
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X = _dense(X)
+        self.classes_, y_idx = np.unique(np.asarray(y), return_inverse=True)
+        self.n_features_in_ = X.shape[1]
+        self.k_ = min(self.n_neighbors, len(X))
+
+        if self.mode == "ivf":
+            self._build_ivf(X, y_idx)
+            self.recall_ = self._estimate_recall()
+        else:
+            self.knn_ = KNeighborsClassifier(n_neighbors=self.k_, n_jobs=self.n_jobs).fit(X, y_idx)
+            self.recall_ = 1.0
+        return self
+
+    # -----------------------------------------------------
+    # IVF: CENTROID + DAFTAR ANGGOTA YANG BERURUTAN DI MEMORI
+    # -----------------------------------------------------
+    def _build_ivf(self, X, y_idx):
+        n = len(X)
+        n_lists = int(np.sqrt(n)) if self.n_lists == "auto" else int(self.n_lists)
+        n_lists = max(1, min(n_lists, n))
+        rng = np.random.default_rng(self.random_state)
+        sample = X[rng.choice(n, size=min(n, 50 * n_lists), replace=False)]
+        km = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=3,
+                             random_state=self.random_state).fit(sample)
+        labels = km.predict(X)
+
+        # anggota tiap list disimpan bersebelahan -> query cukup slicing, tanpa fancy indexing
+        order = np.argsort(labels, kind="stable")
+        self.n_lists_ = n_lists
+        self.centroids_ = km.cluster_centers_
+        self.offsets_ = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))])
+        self.X_ = X[order]
+        self.y_ = y_idx[order]
+        self.norms_ = np.einsum("ij,ij->i", self.X_, self.X_)
+
+    def _ivf_batch(self, Q, k: int = None):
+        k = k or self.k_
+        m = len(Q)
+        q_norms = np.einsum("ij,ij->i", Q, Q)
+        d_c = -2 * Q @ self.centroids_.T + np.einsum("ij,ij->i", self.centroids_, self.centroids_)
+        n_probe = min(self.n_probe, self.n_lists_)
+        probe = np.argpartition(d_c, n_probe - 1, axis=1)[:, :n_probe] if n_probe < self.n_lists_ \
+            else np.broadcast_to(np.arange(self.n_lists_), (m, n_probe))
+
+        # kelompokkan query per list yang di-probe: satu perkalian matriks per list
+        lists = probe.ravel()
+        queries = np.repeat(np.arange(m), n_probe)
+        by_list = np.argsort(lists, kind="stable")
+        lists, queries = lists[by_list], queries[by_list]
+        bounds = np.flatnonzero(np.diff(lists)) + 1
+
+        best_d = np.full((m, k), np.inf)
+        best_i = np.full((m, k), -1, dtype=np.intp)
+        for q, l in zip(np.split(queries, bounds), lists[np.r_[0, bounds]]):
+            lo, hi = self.offsets_[l], self.offsets_[l + 1]
+            if hi == lo:
+                continue
+            d = q_norms[q, None] - 2 * Q[q] @ self.X_[lo:hi].T + self.norms_[lo:hi]
+            cand_d = np.hstack([best_d[q], d])
+            cand_i = np.hstack([best_i[q], np.broadcast_to(np.arange(lo, hi), d.shape)])
+            sel = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            best_d[q] = np.take_along_axis(cand_d, sel, axis=1)
+            best_i[q] = np.take_along_axis(cand_i, sel, axis=1)
+        return np.sqrt(np.maximum(best_d, 0)), best_i
+
+    def _estimate_recall(self) -> float:
+        # recall@k terhadap brute force eksak pada sampel titik training, dengan titik query itu
+        # sendiri dikeluarkan dari indeks (leave-one-out): tanpa ini setiap query menemukan dirinya
+        # di cell-nya sendiri dan recall terlihat lebih tinggi daripada untuk data baru
+        k = self.k_
+        if len(self.X_) <= k:
+            return 1.0
+        rng = np.random.default_rng(self.random_state)
+        own = rng.choice(len(self.X_), size=min(self.recall_sample, len(self.X_)), replace=False)
+        Q = self.X_[own]
+
+        def without_self(d, i):
+            d = np.where(i == own[:, None], np.inf, d)
+            return np.sort(d, axis=1)[:, :k]
+
+        exact = without_self(*NearestNeighbors(n_neighbors=k + 1, algorithm="brute").fit(self.X_).kneighbors(Q))
+        approx = without_self(*self._ivf_batch(Q, k + 1))
+        # berbasis jarak agar tetangga dengan jarak sama (duplikat) tidak dihitung miss
+        kth = exact[:, -1:] * (1 + 1e-9) + 1e-12
+        return float((approx <= kth).sum() / approx.size)
+
+    # -----------------------------------------------------
+    # QUERY (BATCH PARALEL, THREAD: NUMPY MELEPAS GIL)
+    # -----------------------------------------------------
+    def kneighbors(self, X):
+        X = _dense(X)
+        if self.mode != "ivf":
+            return self.knn_.kneighbors(X)
+        starts = range(0, len(X), self.batch_size)
+        n_jobs = min(effective_n_jobs(self.n_jobs), max(len(starts), 1))
+        parts = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(self._ivf_batch)(X[i:i + self.batch_size]) for i in starts
+        )
+        if not parts:
+            return np.empty((0, self.k_)), np.empty((0, self.k_), dtype=np.intp)
+        return np.vstack([p[0] for p in parts]), np.vstack([p[1] for p in parts])
+
+    def predict_proba(self, X):
+        if self.mode != "ivf":
+            return self.knn_.predict_proba(_dense(X))
+        _, idx = self.kneighbors(X)
+        valid = idx >= 0
+        votes = np.zeros((len(idx), len(self.classes_)))
+        rows = np.broadcast_to(np.arange(len(idx))[:, None], idx.shape)
+        np.add.at(votes, (rows[valid], self.y_[idx[valid]]), 1)
+        return votes / np.maximum(valid.sum(axis=1, keepdims=True), 1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def make_knn(n_rows: int = None, mode: str = "auto", n_probe: int = 8):
+    if mode == "auto":
+        mode = "ivf" if n_rows is not None and n_rows > KNN_EXACT_MAX_ROWS else "exact"
+    return IndexedKNN(mode=mode, n_probe=n_probe)
+
+
+# =========================================================
+# GRADIENT BOOSTING HISTOGRAM (BINNED, MULTITHREAD, NaN NATIVE)
+# =========================================================
+class DenseHistGradientBoosting(HistGradientBoostingClassifier):
+    # HGB tidak menerima CSR: dummy stasiun di-densify di sini agar pipeline
+    # (scaler sparse -> model) tetap bisa dipakai apa adanya di prediction/scoring/serve
+    def fit(self, X, y, sample_weight=None):
+        return super().fit(_dense(X), y, sample_weight=sample_weight)
+
+    def decision_function(self, X):
+        return super().decision_function(_dense(X))
+
+    def predict_proba(self, X):
+        return super().predict_proba(_dense(X))
+
+    def predict(self, X):
+        return super().predict(_dense(X))
+
+
+def make_boosting(n_rows: int = None):
+    if n_rows is not None and n_rows > GB_EXACT_MAX_ROWS:
+        return DenseHistGradientBoosting(random_state=42)
+    return GradientBoostingClassifier(random_state=42)
+
+
+def model_variant(est) -> str:
+    if isinstance(est, SGDClassifier):
+        return f"SGD {est.loss} (partial_fit per chunk)"
+    if isinstance(est, GaussianNB):
+        return "GaussianNB (partial_fit per chunk)"
+    if isinstance(est, HistGradientBoostingClassifier):
+        return f"HistGradientBoosting ({est.max_bins} bin, multithread)"
+    if isinstance(est, GradientBoostingClassifier):
+        return "GradientBoosting (split eksak)"
+    if isinstance(est, IndexedKNN):
+        if est.mode == "ivf":
+            return f"KNN k={est.n_neighbors} IVF ({getattr(est, 'n_lists_', est.n_lists)} list, n_probe={est.n_probe})"
+        method = getattr(getattr(est, "knn_", None), "_fit_method", "tree")
+        return f"KNN k={est.n_neighbors} eksak ({method})"
+    if isinstance(est, ScalableSVC):
+        if est.kernel == "linear":
+            return "LinearSVC + Platt (holdout)"
+        return f"Nystroem {est.kernel.upper()} ({est.n_components}) + LinearSVC + Platt (holdout)"
+    if isinstance(est, SVC):
+        return f"SVC {est.kernel.upper()} (eksak)"
+    return "-"
@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+
+
+# =========================================================
+# INFERENCE ENGINE (PIPELINE SKLEARN -> SCORER NUMPY)
+# =========================================================
+# Scorer mengembalikan kelas + probabilitas dalam satu pass:
+#   - Logistic Regression: scaler dilipat ke koefisien (1 dot product)
+#   - Decision Tree / Random Forest: node semua tree digabung ke array kontigu,
+#     traversal dilakukan vektor untuk seluruh batch
+#   - model lain: fallback 1x predict_proba sklearn
+
+
+def _as_array(X, feature_names) -> np.ndarray:
+    if isinstance(X, pd.DataFrame) and feature_names is not None:
+        X = X[list(feature_names)]
+    X = np.asarray(X, dtype=np.float64)
+    # sama seperti validasi sklearn: NaN/inf ditolak, bukan diam-diam dibawa ke traversal/dot product
+    if not np.isfinite(X).all():
+        raise ValueError("Input X contains NaN or infinity.")
+    return X
+
+
+def _scaler_params(scaler: StandardScaler, n_features: int):
+    mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def affine_params(step):
+    # (nama fitur urutan output, mean, scale) bila preprocessing = transform affine per kolom:
+    # StandardScaler biasa, atau ColumnTransformer numerik di-scale + dummy sparse apa adanya
+    if isinstance(step, StandardScaler):
+        n = step.n_features_in_
+        names = getattr(step, "feature_names_in_", None)
+        return (list(names) if names is not None else None,) + _scaler_params(step, n)
+    if not isinstance(step, ColumnTransformer):
+        return None
+
+    names, means, scales = [], [], []
+    for _, trans, cols in step.transformers_:
+        cols = list(cols)
+        if trans == "drop" or not cols:
+            continue
+        if isinstance(trans, StandardScaler):
+            m, s = _scaler_params(trans, len(cols))
+        elif trans == "passthrough" or isinstance(trans, FunctionTransformer):
+            # dummy apa adanya (konversi CSR); kesetaraan tetap dicek di compile_verified
+            m, s = np.zeros(len(cols)), np.ones(len(cols))
+        else:
+            return None
+        names += cols
+        means.append(m)
+        scales.append(s)
+    return names, np.concatenate(means), np.concatenate(scales)
+
+
+class _Scorer:
+    kind = "sklearn"
+
+    def __init__(self, feature_names=None, classes=(0, 1)):
+        self.feature_names = feature_names
+        self.classes_ = np.asarray(classes)
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self._proba(_as_array(X, self.feature_names))
+
+    def score(self, X, threshold: float = None):
+        # (kelas, probabilitas kelas positif) dalam satu pass;
+        # threshold = operating point dari Modeling (positif bila proba >= threshold)
+        proba = self.predict_proba(X)
+        if threshold is not None:
+            return self.classes_[(proba[:, 1] >= threshold).astype(int)], proba[:, 1]
+        return self.classes_[np.argmax(proba, axis=1)], proba[:, 1]
+
+    def predict(self, X) -> np.ndarray:
+        return self.score(X)[0]
+
+
+class SklearnScorer(_Scorer):
+    def __init__(self, pipe):
+        super().__init__(classes=pipe.classes_)
+        self.pipe = pipe
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.pipe.predict_proba(X)
+
+
+class LinearScorer(_Scorer):
+    kind = "linear"
+
+    def __init__(self, params: tuple, model: LogisticRegression):
+        feature_names, mean, scale = params
+        super().__init__(feature_names, model.classes_)
+        w = model.coef_[0] / scale
+        self.coef = np.ascontiguousarray(w)
+        self.intercept = float(model.intercept_[0] - np.dot(w, mean))
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        z = X @ self.coef + self.intercept
+        p1 = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1.0 - p1, p1])
+
+    def score(self, X, threshold: float = None):
+        # tanpa threshold sama seperti LogisticRegression.predict: kelas positif bila decision > 0
+        X = _as_array(X, self.feature_names)
+        z = X @ self.coef + self.intercept
+        p1 = 1.0 / (1.0 + np.exp(-z))
+        positive = z > 0 if threshold is None else p1 >= threshold
+        return self.classes_[positive.astype(int)], p1
+
+
+class TreeEnsembleScorer(_Scorer):
+    kind = "tree"
+
+    def __init__(self, params: tuple, trees: list, classes=(0, 1), batch_size: int = 8192):
+        feature_names, self.mean, self.scale = params
+        super().__init__(feature_names, classes)
+        self.batch_size = batch_size
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for est in trees:
+            t = est.tree_
+            leaf = t.children_left == -1
+            roots.append(offset)
+            # leaf menunjuk dirinya sendiri -> traversal cukup diulang max_depth kali
+            own = np.arange(t.node_count) + offset
+            lefts.append(np.where(leaf, own, t.children_left + offset))
+            rights.append(np.where(leaf, own, t.children_right + offset))
+            features.append(np.where(leaf, 0, t.feature))
+            thresholds.append(np.where(leaf, np.inf, t.threshold))
+            v = t.value[:, 0, :]
+            values.append(v / v.sum(axis=1, keepdims=True))
+            offset += t.node_count
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=np.intp)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.n_trees = len(trees)
+        self.max_depth = max(est.tree_.max_depth for est in trees)
+
+    def _proba_batch(self, X: np.ndarray) -> np.ndarray:
+        # sklearn membandingkan fitur float32 dengan threshold float64
+        Xs = ((X - self.mean) / self.scale).astype(np.float32).astype(np.float64)
+        n = Xs.shape[0]
+        rows = np.arange(n)[None, :]
+        node = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.max_depth):
+            go_left = Xs[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=0)
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) <= self.batch_size:
+            return self._proba_batch(X)
+        return np.vstack([
+            self._proba_batch(X[i:i + self.batch_size])
+            for i in range(0, len(X), self.batch_size)
+        ])
+
+
+# traversal vektor NumPy = max_depth x (tree x baris) gather; di atas ~4k (baris x tree)
+# predict_proba sklearn (Cython, paralel per tree) lebih cepat -> batch besar dialihkan ke sana
+TREE_COMPILED_MAX_WORK = 4_096
+
+
+class RoutedScorer(_Scorer):
+    # scorer compiled untuk batch kecil (latensi 1 baris / micro-batch), sklearn untuk batch besar
+    def __init__(self, compiled: _Scorer, pipe, max_rows: int):
+        super().__init__(compiled.feature_names, compiled.classes_)
+        self.kind = compiled.kind
+        self.compiled = compiled
+        self.fallback = SklearnScorer(pipe)
+        self.max_rows = max_rows
+
+    def _route(self, X) -> _Scorer:
+        return self.compiled if len(X) <= self.max_rows else self.fallback
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self._route(X).predict_proba(X)
+
+    def score(self, X, threshold: float = None):
+        return self._route(X).score(X, threshold)
+
+
+# =========================================================
+# COMPILE + VERIFIKASI
+# =========================================================
+def as_scorer(model) -> _Scorer:
+    return model if isinstance(model, _Scorer) else SklearnScorer(model)
+
+
+def compile_pipeline(pipe):
+    steps = dict(pipe.named_steps) if hasattr(pipe, "named_steps") else {}
+    model = steps.get("model")
+    params = affine_params(steps.get("scaler"))
+
+    if params is None or len(steps) != 2 or len(model.classes_) != 2:
+        return SklearnScorer(pipe)
+
+    if type(model) is LogisticRegression:
+        return LinearScorer(params, model)
+    if type(model) is DecisionTreeClassifier:
+        return TreeEnsembleScorer(params, [model], model.classes_)
+    if type(model) is RandomForestClassifier:
+        return TreeEnsembleScorer(params, list(model.estimators_), model.classes_)
+    return SklearnScorer(pipe)
+
+
+def verify(scorer, pipe, X, atol: float = 1e-9) -> dict:
+    pred, proba = scorer.score(X)
+    ref_pred = pipe.predict(X)
+    ref_proba = pipe.predict_proba(X)[:, 1]
+    diff = float(np.max(np.abs(proba - ref_proba))) if len(proba) else 0.0
+    return {
+        "kind": scorer.kind,
+        "pred_match": float(np.mean(pred == ref_pred)) if len(pred) else 1.0,
+        "max_abs_diff": diff,
+        "ok": bool(np.array_equal(pred, ref_pred) and diff <= atol),
+    }
+
+
+def compile_verified(pipe, X_check, atol: float = 1e-9):
+    # scorer hasil compile hanya dipakai bila identik dengan sklearn pada data uji
+    scorer = compile_pipeline(pipe)
+    if scorer.kind == "sklearn":
+        return scorer, None
+    report = verify(scorer, pipe, X_check, atol=atol)
+    if not report["ok"]:
+        return SklearnScorer(pipe), report
+    if isinstance(scorer, TreeEnsembleScorer):
+        scorer = RoutedScorer(scorer, pipe, max(64, TREE_COMPILED_MAX_WORK // scorer.n_trees))
+    return scorer, report
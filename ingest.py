@@ -0,0 +1,280 @@
+import csv
+import gzip
+import io
+import os
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # engine cepat opsional, fallback ke parser C pandas
+    pa = None
+    pa_csv = None
+
+try:
+    import zstandard
+except ImportError:  # hanya dibutuhkan untuk .zst tanpa pyarrow
+    zstandard = None
+
+CHUNK_ROWS = 100_000
+BLOCK_BYTES = 16 << 20
+
+# penanda nilai kosong yang umum di export ISPU ("---") selain default
+NA_VALUES = ["", "NA", "N/A", "NaN", "nan", "null", "-", "--", "---"]
+
+_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def fast_engine() -> str:
+    return "pyarrow" if pa_csv is not None else "pandas"
+
+
+# =========================================================
+# SUMBER FILE (PATH / UPLOAD STREAMLIT / FILE-LIKE)
+# =========================================================
+class _NonClosing(io.RawIOBase):
+    # pa.PythonFile / CompressedInputStream / zstd stream_reader menutup file yang dibungkus;
+    # upload Streamlit harus tetap terbuka untuk pass berikutnya (sniff header, baca ulang)
+    def __init__(self, f):
+        self._f = f
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return hasattr(self._f, "seek")
+
+    def read(self, size=-1):
+        return self._f.read(size)
+
+    def readinto(self, b):
+        data = self._f.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._f.seek(offset, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+
+def _open_raw(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return _NonClosing(source), False
+
+
+def _rewind(source):
+    if not isinstance(source, (str, os.PathLike)) and hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    if getattr(source, "size", None) is not None:
+        return int(source.size)
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    return None
+
+
+def _compression(raw, name: str):
+    name = (name or "").lower()
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith((".zst", ".zstd")):
+        return "zstd"
+    # upload tanpa ekstensi jelas -> cek magic bytes
+    if hasattr(raw, "peek"):
+        head = raw.peek(4)[:4]
+    else:
+        pos = raw.tell()
+        head = raw.read(4)
+        raw.seek(pos)
+    for magic, codec in _MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _decompressed(raw, codec):
+    if codec is None:
+        return raw
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if pa is not None:
+        return pa.CompressedInputStream(pa.PythonFile(raw, mode="r"), codec)
+    if zstandard is None:
+        raise ValueError("File .zst membutuhkan paket 'pyarrow' atau 'zstandard'.")
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+
+
+def sniff_header(source) -> list:
+    # hanya baris pertama yang didekompresi + dibaca (untuk deteksi dataset & usecols)
+    raw, owned = _open_raw(source)
+    try:
+        stream = _decompressed(raw, _compression(raw, getattr(source, "name", str(source))))
+        head = b""
+        while b"\n" not in head:
+            block = stream.read(64 << 10)
+            if not block:
+                break
+            head += block
+        line = head.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+        return next(csv.reader([line]), [])
+    finally:
+        if owned:
+            raw.close()
+        _rewind(source)
+
+
+# =========================================================
+# DTYPE EKSPLISIT
+# =========================================================
+def _arrow_type(dtype: str):
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype in ("str", "string", "object"):
+        return pa.string()
+    return pa.from_numpy_dtype(dtype)
+
+
+def _is_text(dtype: str) -> bool:
+    return dtype in ("category", "str", "string", "object")
+
+
+def _coerce(df: pd.DataFrame, dtype: dict) -> pd.DataFrame:
+    # kolom numerik yang berisi teks aneh: baca sebagai string, lalu konversi per chunk (teks -> NaN)
+    for c, t in dtype.items():
+        if c in df.columns and not _is_text(t):
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(t)
+    return df
+
+
+def _concat(chunks: list) -> pd.DataFrame:
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    # kategori tiap chunk berbeda -> satukan agar hasil concat tetap categorical
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            cat = union_categoricals([c[col] for c in chunks]).categories
+            for c in chunks:
+                c[col] = c[col].cat.set_categories(cat)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# =========================================================
+# ENGINE
+# =========================================================
+def _iter_pyarrow(raw, codec, dtype, usecols, chunksize):
+    stream = pa.PythonFile(raw, mode="r")
+    if codec is not None:
+        stream = pa.CompressedInputStream(stream, codec)
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: _arrow_type(t) for c, t in (dtype or {}).items()},
+            include_columns=usecols,
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    batches, rows = [], 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            yield _arrow_frame(batches)
+            batches, rows = [], 0
+    if batches:
+        yield _arrow_frame(batches)
+
+
+def _arrow_frame(batches):
+    table = pa.Table.from_batches(batches).unify_dictionaries()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _iter_pandas(raw, codec, dtype, usecols, chunksize):
+    reader = pd.read_csv(
+        _decompressed(raw, codec),
+        dtype=dtype or None,
+        usecols=usecols,
+        na_values=NA_VALUES,
+        keep_default_na=False,
+        chunksize=chunksize,
+        low_memory=False,
+    )
+    with reader:
+        yield from reader
+
+
+def iter_csv(source, dtype: dict = None, chunksize: int = CHUNK_ROWS, engine: str = None,
+             usecols: list = None):
+    # generator DataFrame per chunk: memori parser terbatas, file .gz/.zst dibaca sebagai stream;
+    # kolom di luar usecols tidak pernah dimaterialisasi
+    engine = engine or fast_engine()
+    raw, owned = _open_raw(source)
+    try:
+        codec = _compression(raw, getattr(source, "name", str(source)))
+        if engine == "pyarrow":
+            yield from _iter_pyarrow(raw, codec, dtype, usecols, chunksize)
+        else:
+            yield from _iter_pandas(raw, codec, dtype, usecols, chunksize)
+    finally:
+        if owned:
+            raw.close()
+        _rewind(source)
+
+
+def iter_csv_typed(source, dtype: dict = None, chunksize: int = CHUNK_ROWS, engine: str = None,
+                   usecols: list = None):
+    # seperti iter_csv, tapi nilai aneh di kolom numerik tidak menghentikan stream:
+    # sisa file dibaca ulang sebagai string (baris yang sudah di-yield dilewati) lalu di-coerce
+    done = 0
+    try:
+        for chunk in iter_csv(source, dtype, chunksize, engine, usecols):
+            done += len(chunk)
+            yield chunk
+        return
+    except (ValueError, TypeError):  # termasuk ArrowInvalid
+        if not dtype:
+            raise
+    loose = {c: ("str" if not _is_text(t) else t) for c, t in dtype.items()}
+    for chunk in iter_csv(source, loose, chunksize, engine, usecols):
+        if done >= len(chunk):
+            done -= len(chunk)
+            continue
+        chunk, done = chunk.iloc[done:], 0
+        yield _coerce(chunk, dtype)
+
+
+def read_csv(source, dtype: dict = None, chunksize: int = CHUNK_ROWS, engine: str = None,
+             usecols: list = None):
+    engine = engine or fast_engine()
+    t0 = time.perf_counter()
+    chunks = list(iter_csv_typed(source, dtype, chunksize, engine, usecols))
+    df = _concat(chunks)
+    seconds = time.perf_counter() - t0
+
+    n_bytes = _size(source)
+    stats = {
+        "engine": engine,
+        "rows": len(df),
+        "chunks": len(chunks),
+        "seconds": seconds,
+        "rows_per_s": len(df) / seconds if seconds else 0.0,
+        "mb_per_s": n_bytes / seconds / 1e6 if (n_bytes and seconds) else None,
+        "memory_mb": float(df.memory_usage(deep=True).sum()) / 1e6,
+    }
+    return df, stats
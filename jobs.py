@@ -0,0 +1,97 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+# =========================================================
+# BACKGROUND JOB (TRAINING DI LUAR THREAD SCRIPT STREAMLIT)
+# =========================================================
+class Job:
+    def __init__(self, key: str, label: str, total: int):
+        self.key = key
+        self.label = label
+        self.total = total
+        self.status = "queued"  # queued -> running -> done / cancelled / error
+        self.rows = []
+        self.results = {}
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def report(self, name: str, row: dict, result=None):
+        # dipanggil dari thread job setiap kali satu model selesai
+        with self._lock:
+            self.rows.append(row)
+            self.results[name] = result
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = (self.finished or time.time()) - (self.started or self.created)
+            return {
+                "key": self.key,
+                "label": self.label,
+                "status": self.status,
+                "done": len(self.rows),
+                "total": self.total,
+                "rows": list(self.rows),
+                "error": self.error,
+                "elapsed": elapsed,
+            }
+
+
+class JobManager:
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="training-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key: str, label: str, total: int, target) -> Job:
+        # key deterministik (dataset + konfigurasi) -> user yang kembali mendapat job yang sama
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status in ("queued", "running", "done"):
+                return job
+            job = Job(key, label, total)
+            self._jobs[key] = job
+
+        self._executor.submit(self._run, job, target)
+        return job
+
+    def _run(self, job: Job, target):
+        job.status = "running"
+        job.started = time.time()
+        try:
+            target(job)
+            cancelled = job.cancel_event.is_set() and len(job.rows) < job.total
+            job.status = "cancelled" if cancelled else "done"
+        except Exception:
+            job.error = traceback.format_exc()
+            job.status = "error"
+        finally:
+            job.finished = time.time()
+
+    def cancel(self, key: str):
+        job = self.get(key)
+        if job is not None:
+            job.cancel()
+
+    def forget(self, key: str):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.active:
+                del self._jobs[key]
@@ -0,0 +1,211 @@
+import numpy as np
+from scipy.stats import rankdata
+
+
+N_BOOTSTRAP = 1000
+CI_LEVEL = 0.95
+# bootstrap AUC memakai skor yang di-bin per kuantil (tie tetap tie); nilai AUC utama tetap eksak
+AUC_BOOTSTRAP_BINS = 256
+
+
+# =========================================================
+# CONFUSION MATRIX + METRIK TURUNAN (VEKTOR, BANYAK MODEL SEKALIGUS)
+# =========================================================
+def confusion(y_true, y_pred) -> np.ndarray:
+    # [[TN, FP], [FN, TP]] seperti sklearn.metrics.confusion_matrix untuk label 0/1
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    return np.bincount(2 * y_true + y_pred, minlength=4).reshape(2, 2)
+
+
+def _from_counts(tn, fp, fn, tp) -> dict:
+    # tn/fp/fn/tp boleh array (model x bootstrap); pembagian nol -> 0 (zero_division=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    return {
+        "Accuracy": (tp + tn) / (tn + fp + fn + tp),
+        "Precision": precision,
+        "Recall": recall,
+        "F1": f1,
+    }
+
+
+def _auc_from_ranks(y_true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    # Mann-Whitney: satu sort per baris (rank rata-rata untuk tie) -> AUC eksak = roc_auc_score
+    pos = y_true == 1
+    n_pos, n_neg = pos.sum(), (~pos).sum()
+    ranks = rankdata(scores, axis=-1)
+    return (ranks[..., pos].sum(axis=-1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+# =========================================================
+# KURVA SKOR DARI SATU SORT (ROC, AUC, THRESHOLD SWEEP)
+# =========================================================
+def score_curve(y_true, y_score) -> dict:
+    # TP/FP kumulatif di setiap skor berbeda t (positif bila skor >= t), urut threshold turun;
+    # baris pertama = threshold di atas skor tertinggi (semua negatif)
+    y_true = np.asarray(y_true)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order = np.argsort(-y_score, kind="stable")
+    s, y = y_score[order], y_true[order]
+    last = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1]
+    tp = np.r_[0, np.cumsum(y)[last]]
+    return {
+        "Threshold": np.r_[np.nextafter(s[0], np.inf), s[last]],
+        "TP": tp,
+        "FP": np.r_[0, last + 1] - tp,
+    }
+
+
+def roc_from_curve(curve: dict):
+    # (fpr, tpr, thresholds) setara roc_curve(drop_intermediate=False)
+    tp, fp = curve["TP"], curve["FP"]
+    fpr = fp / max(fp[-1], 1)
+    tpr = tp / max(tp[-1], 1)
+    return fpr, tpr, np.r_[np.inf, curve["Threshold"][1:]]
+
+
+def auc_from_curve(curve: dict) -> float:
+    # trapesium atas titik ROC per skor berbeda = Mann-Whitney dengan rank rata-rata untuk tie
+    tp, fp = curve["TP"], curve["FP"]
+    if tp[-1] == 0 or fp[-1] == 0:
+        return float("nan")
+    return float(np.sum(np.diff(fp) * (tp[1:] + tp[:-1])) / (2 * tp[-1] * fp[-1]))
+
+
+def roc_points(y_true, y_score):
+    return roc_from_curve(score_curve(y_true, y_score))
+
+
+# =========================================================
+# THRESHOLD SWEEP / OPERATING POINT (SORT YANG SAMA)
+# =========================================================
+def sweep_from_curve(curve: dict, cost_fp: float = 1.0, cost_fn: float = 1.0) -> dict:
+    # metrik di setiap threshold kurva; cost = cost_fp * FP + cost_fn * FN (total di test set)
+    tp, fp = curve["TP"], curve["FP"]
+    fn = tp[-1] - tp
+    tn = fp[-1] - fp
+    out = _from_counts(tn, fp, fn, tp)
+    out.update({
+        "Threshold": curve["Threshold"],
+        "TP": tp, "FP": fp, "FN": fn, "TN": tn,
+        "Cost": cost_fp * fp + cost_fn * fn,
+    })
+    return out
+
+
+def threshold_sweep(y_true, y_score, cost_fp: float = 1.0, cost_fn: float = 1.0) -> dict:
+    return sweep_from_curve(score_curve(y_true, y_score), cost_fp=cost_fp, cost_fn=cost_fn)
+
+
+def sweep_index(thresholds, t: float) -> int:
+    # baris sweep yang setara dengan "positif bila skor >= t" (threshold turun, baris 0 = semua negatif)
+    return max(int(np.searchsorted(-np.asarray(thresholds), -t, side="right")) - 1, 0)
+
+
+def operating_point(sweep: dict, strategy: str, recall_target: float = None, manual: float = 0.5):
+    # (threshold, indeks baris sweep); semua strategi lewat sweep_index yang sama
+    # sehingga metrik yang ditampilkan = metrik threshold yang disimpan
+    if strategy == "f1":
+        t = sweep["Threshold"][int(np.argmax(sweep["F1"]))]
+    elif strategy == "recall":
+        # recall naik saat threshold turun; baris terakhir selalu recall 1.0
+        ok = np.flatnonzero(np.asarray(sweep["Recall"]) >= recall_target)
+        t = sweep["Threshold"][ok[int(np.argmax(np.asarray(sweep["Precision"])[ok]))]]
+    elif strategy == "cost":
+        t = sweep["Threshold"][int(np.argmin(sweep["Cost"]))]
+    elif strategy == "manual":
+        t = manual
+    else:
+        t = 0.5
+    t = float(t)
+    return t, sweep_index(sweep["Threshold"], t)
+
+
+# =========================================================
+# BOOTSTRAP CI (MULTINOMIAL ATAS SEL, TANPA LOOP PER RESAMPLE)
+# =========================================================
+# Resample n baris dengan pengembalian = distribusi multinomial atas jumlah per sel.
+# F1 hanya bergantung pada 4 sel confusion matrix, AUC pada jumlah (bin skor, kelas),
+# jadi semua resample cukup satu panggilan rng.multinomial untuk semua model.
+def _binned_cells(y_true: np.ndarray, P: np.ndarray, n_bins: int) -> np.ndarray:
+    # (model, bin skor naik, kelas) -> jumlah baris
+    ranks = rankdata(P, method="min", axis=1) - 1
+    bins = np.minimum((ranks * n_bins) // P.shape[1], n_bins - 1)
+    cells = np.zeros((len(P), n_bins, 2), dtype=np.int64)
+    model = np.repeat(np.arange(len(P)), P.shape[1])
+    np.add.at(cells, (model, bins.ravel(), np.tile(y_true, len(P))), 1)
+    return cells
+
+
+def _auc_from_cells(cells: np.ndarray) -> np.ndarray:
+    neg, pos = cells[..., 0], cells[..., 1]
+    below = np.cumsum(neg, axis=-1) - neg
+    n_pos, n_neg = pos.sum(axis=-1), neg.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (pos * (below + 0.5 * neg)).sum(axis=-1) / (n_pos * n_neg)
+
+
+def bootstrap_ci(y_true, cms: np.ndarray, P: np.ndarray, n_boot: int = N_BOOTSTRAP,
+                 level: float = CI_LEVEL, seed: int = 42) -> dict:
+    y_true = np.asarray(y_true, dtype=np.int64)
+    n = len(y_true)
+    rng = np.random.default_rng(seed)
+    q = [(1 - level) / 2, (1 + level) / 2]
+
+    # F1: (n_boot, model, 4) dari confusion matrix tiap model
+    counts = rng.multinomial(n, cms.reshape(len(cms), 4) / n, size=(n_boot, len(cms)))
+    f1 = _from_counts(*np.moveaxis(counts, -1, 0))["F1"]
+
+    # AUC: (n_boot, model, bin, kelas)
+    cells = _binned_cells(y_true, P, min(AUC_BOOTSTRAP_BINS, n))
+    flat = rng.multinomial(n, cells.reshape(len(P), -1) / n, size=(n_boot, len(P)))
+    auc = _auc_from_cells(flat.reshape(n_boot, *cells.shape))
+
+    return {
+        "F1": np.nanquantile(f1, q, axis=0).T,
+        "AUC": np.nanquantile(auc, q, axis=0).T,
+    }
+
+
+# =========================================================
+# EVALUASI BANYAK MODEL (MATRIKS PROBABILITAS BERTUMPUK)
+# =========================================================
+def evaluate_models(y_true, probas: dict, preds: dict, n_boot: int = N_BOOTSTRAP,
+                    level: float = CI_LEVEL, seed: int = 42) -> dict:
+    names = list(probas)
+    y_true = np.asarray(y_true, dtype=np.int64)
+    P = np.vstack([np.asarray(probas[n], dtype=np.float64) for n in names])
+    Y = np.vstack([np.asarray(preds[n], dtype=np.int64) for n in names])
+
+    # semua confusion matrix dalam satu bincount (offset 4 per model)
+    codes = 2 * y_true + Y + 4 * np.arange(len(names))[:, None]
+    cms = np.bincount(codes.ravel(), minlength=4 * len(names)).reshape(len(names), 2, 2)
+    scores = _from_counts(cms[:, 0, 0], cms[:, 0, 1], cms[:, 1, 0], cms[:, 1, 1])
+    scores["AUC"] = _auc_from_ranks(y_true, P)
+    ci = bootstrap_ci(y_true, cms, P, n_boot=n_boot, level=level, seed=seed) if n_boot else None
+
+    out = {}
+    for i, name in enumerate(names):
+        out[name] = {
+            "metrics": {k: float(v[i]) for k, v in scores.items()},
+            "confusion": cms[i],
+            "ci": {k: tuple(float(x) for x in v[i]) for k, v in ci.items()} if ci else None,
+        }
+    return out
+
+
+def binary_report(y_true, y_pred, y_proba) -> dict:
+    # satu model: confusion matrix (bincount) + satu sort skor -> metrik, AUC & kurva ROC/sweep
+    cm = confusion(y_true, y_pred)
+    curve = score_curve(y_true, y_proba)
+    metrics = {k: float(v) for k, v in _from_counts(cm[0, 0], cm[0, 1], cm[1, 0], cm[1, 1]).items()}
+    metrics["AUC"] = auc_from_curve(curve)
+    return {"metrics": metrics, "curve": curve}
+
+
+def binary_metrics(y_true, y_pred, y_proba) -> dict:
+    # pengganti 5 panggilan sklearn.metrics terpisah
+    return binary_report(y_true, y_pred, y_proba)["metrics"]
@@ -1,42 +1,478 @@
+import hashlib
+import io
+import json
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score,
-    f1_score, confusion_matrix, roc_auc_score, roc_curve
-)
 
 from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
 
 import plotly.express as px
 
+from charts import decimate_curve, roc_frame
 from data_loader import load_and_prepare
+from dataset_cache import content_hash
+from estimators import KNN_MODES, make_boosting, make_knn, make_svm, model_variant
+from jobs import JobManager
+from metrics import (
+    CI_LEVEL, confusion, evaluate_models, operating_point, roc_from_curve, score_curve, sweep_from_curve
+)
+from profiling import memory_caption, record, span
+from racing import race, race_schedule
+from registry import default_registry
+from streaming import STREAM_CHUNK_ROWS, StreamingRun, stream_models
+from tuning import CANDIDATES_PER_SESSION, default_trial_store, tune_model, tuned_models
+from training import (
+    SPLIT_SEED, TEST_SIZE, TrainingCache, TrainingRun, rank_results
+)
 
 
 # =========================================================
 # MODEL REGISTRY
 # =========================================================
-def _get_models(dataset_type: str):
+def _get_models(dataset_type: str, n_rows: int = None, knn_mode: str = "auto", n_probe: int = 8):
     models = {
         "Logistic Regression": LogisticRegression(max_iter=2000),
-        "KNN": KNeighborsClassifier(),
-        "SVM": SVC(probability=True),
+        # indeks tetangga dibangun sekali saat fit (eksak atau IVF untuk data besar)
+        "KNN": make_knn(n_rows, mode=knn_mode, n_probe=n_probe),
+        # varian SVM dipilih otomatis dari jumlah baris training
+        "SVM": make_svm(n_rows),
         "Decision Tree": DecisionTreeClassifier(random_state=42),
         "Random Forest": RandomForestClassifier(random_state=42),
     }
     if dataset_type == "environment":
-        models["Gradient Boosting"] = GradientBoostingClassifier(random_state=42)
+        # histogram-based (binned, multithread) otomatis untuk riwayat ISPU yang panjang
+        models["Gradient Boosting"] = make_boosting(n_rows)
     return models
 
 
+# =========================================================
+# TRAINING CACHE (SHARED ANTAR RERUN & SESSION)
+# =========================================================
+@st.cache_resource
+def _training_cache():
+    return TrainingCache()
+
+
+def _cache_panel(cache: TrainingCache, registry, keys: list):
+    # keys = artefak model di halaman ini (dataset + konfigurasi saat ini)
+    stats = cache.stats()
+    c1, c2 = st.columns([4, 1])
+    with c1:
+        st.caption(
+            f"⚡ Cache training: {stats['hits']} hit • {stats['misses']} miss • "
+            f"{stats['entries']} model tersimpan • {registry.loads} dimuat dari registry "
+            f"({registry.root})"
+        )
+    with c2:
+        if st.button("🗑️ Reset & latih ulang", use_container_width=True,
+                     help="Hapus cache memori dan artefak registry model dataset ini, lalu latih ulang."):
+            cache.clear()
+            registry.delete_artifacts(keys)
+            st.session_state.pop("metric_ci", None)
+            st.rerun()
+
+
+# =========================================================
+# BACKGROUND TRAINING (KOMPARASI SEMUA MODEL)
+# =========================================================
+@st.cache_resource
+def _job_manager():
+    return JobManager()
+
+
+def _feature_importance(entry: dict, run: TrainingRun, max_rows: int = 10_000):
+    # feature_importances_ bila ada; HistGradientBoosting -> permutation importance
+    # pada (sampel) test set, disimpan di entry agar rerun tidak menghitung ulang
+    est = entry["model"].named_steps["model"]
+    if hasattr(est, "feature_importances_"):
+        return est.feature_importances_, "impurity"
+    if "permutation_importance" not in entry:
+        prep = run.prepared()
+        Xt, yt = prep["X_test"], run.y_test
+        if len(yt) > max_rows:
+            idx = np.random.default_rng(SPLIT_SEED).choice(len(yt), size=max_rows, replace=False)
+            Xt, yt = Xt[idx], yt[idx]
+        Xt = Xt.toarray() if hasattr(Xt, "toarray") else Xt
+        result = permutation_importance(est, Xt, yt, scoring="roc_auc", n_repeats=5,
+                                        random_state=SPLIT_SEED, n_jobs=-1)
+        entry["permutation_importance"] = result.importances_mean
+    return entry["permutation_importance"], "permutation"
+
+
+def _result_row(name: str, entry: dict) -> dict:
+    est = entry["model"].named_steps["model"]
+    predict_time = entry.get("predict_time")
+    return {
+        "Model": name,
+        "Varian": model_variant(est),
+        **entry["metrics"],
+        "Waktu (s)": entry["wall_time"],
+        # latensi predict_proba per 1000 baris test; recall indeks hanya untuk KNN (1.0 = eksak)
+        "Latensi (ms/1k)": predict_time / len(entry["y_pred"]) * 1e6 if predict_time is not None else None,
+        "Recall indeks": getattr(est, "recall_", None),
+    }
+
+
+def _entry_curve(y_test, entry: dict) -> dict:
+    # artefak lama belum menyimpan kurva -> dihitung sekali lalu ikut di entry (cache)
+    if entry.get("curve") is None:
+        entry["curve"] = score_curve(y_test, entry["y_proba"])
+    return entry["curve"]
+
+
+def _prediction_key(y_test, entries: dict) -> str:
+    # kunci dari isi prediksi (bukan id objek): entry yang dimuat ulang dari cache -> kunci sama,
+    # model yang dilatih ulang dengan hasil berbeda -> kunci baru
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(y_test, dtype=np.int64).tobytes())
+    for name, entry in entries.items():
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(entry["y_pred"], dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(entry["y_proba"], dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _confidence(y_test, entries: dict) -> dict:
+    # semua model dievaluasi sekaligus (matriks probabilitas bertumpuk) + bootstrap CI;
+    # disimpan per session agar rerun tidak mengulang bootstrap
+    memo = st.session_state.setdefault("metric_ci", {})
+    key = _prediction_key(y_test, entries)
+    if key not in memo:
+        report = evaluate_models(
+            y_test,
+            {name: entry["y_proba"] for name, entry in entries.items()},
+            {name: entry["y_pred"] for name, entry in entries.items()},
+        )
+        if len(memo) >= 8:
+            memo.pop(next(iter(memo)))
+        memo[key] = {name: r["ci"] for name, r in report.items()}
+    return memo[key]
+
+
+def _record_fit_times(entries: dict):
+    # entry dari cache/registry membawa waktu fit aslinya
+    for name, entry in entries.items():
+        for stage, key in (("fit", "fit_time"), ("predict_proba", "predict_time")):
+            if entry.get(key) is not None:
+                record(f"{stage} {name} (job)", entry[key])
+
+
+def _ci_columns(ci: dict) -> dict:
+    pct = f"{CI_LEVEL:.0%}"
+    return {f"F1 {pct} CI": "{:.3f}–{:.3f}".format(*ci["F1"]),
+            f"AUC {pct} CI": "{:.3f}–{:.3f}".format(*ci["AUC"])}
+
+
+def _partial_table(rows: list, ranked: bool = True):
+    if rows:
+        df = pd.DataFrame(rows)
+        st.dataframe(rank_results(df) if ranked else df, use_container_width=True)
+
+
+@st.fragment(run_every=1.0)
+def _job_progress(job_key: str, ranked: bool = True, unit: str = "model"):
+    job = _job_manager().get(job_key)
+    if job is None:
+        return
+    snap = job.snapshot()
+
+    st.progress(
+        snap["done"] / max(snap["total"], 1),
+        text=f"⏳ Training di background: {snap['done']}/{snap['total']} {unit} selesai "
+             f"({snap['elapsed']:.1f}s). Halaman boleh ditinggal, hasil tetap disimpan."
+    )
+    _partial_table(snap["rows"], ranked=ranked)
+
+    if st.button("⛔ Batalkan training", use_container_width=True, key=f"cancel:{job_key}"):
+        job.cancel()
+
+    if not job.active:
+        st.rerun()
+
+
+def _comparison_entries(run: TrainingRun, models: dict):
+    # semua model sudah ada di cache/registry -> langsung tampilkan
+    if not run.missing(models):
+        return run.compare(models)
+
+    manager = _job_manager()
+    job_key = "compare:" + "|".join(run.key(name, mdl) for name, mdl in models.items())
+    job = manager.get(job_key)
+
+    if job is not None and job.status in ("cancelled", "error"):
+        snap = job.snapshot()
+        if snap["status"] == "cancelled":
+            st.warning(f"Training dibatalkan ({snap['done']}/{snap['total']} model selesai).")
+            _partial_table(snap["rows"])
+        else:
+            st.error("Training gagal.")
+            with st.expander("Detail error"):
+                st.code(snap["error"])
+        if not st.button("🔁 Lanjutkan training", use_container_width=True):
+            return None
+        # model yang sudah selesai diambil dari cache, hanya sisanya yang dilatih
+        manager.forget(job_key)
+        job = None
+    elif job is not None and job.status == "done":
+        # job selesai tapi cache sudah di-reset -> jalankan ulang
+        manager.forget(job_key)
+        job = None
+
+    if job is None:
+        def target(job):
+            for name, entry in run.iter_compare(models, cancel=job.cancel_event):
+                job.report(name, _result_row(name, entry))
+
+        manager.submit(job_key, "Perbandingan semua model", len(models), target)
+
+    _job_progress(job_key)
+    return None
+
+
+# =========================================================
+# TUNING HYPERPARAMETER (TRIAL DISIMPAN DI DISK, LANJUT ANTAR SESSION)
+# =========================================================
+def _tuning_panel(run: TrainingRun, base_models: dict):
+    store = default_trial_store()
+    manager = _job_manager()
+
+    with st.expander("🎛️ Tuning hyperparameter (successive halving random search)"):
+        chosen = st.multiselect("Model yang di-tuning", list(base_models), default=list(base_models))
+        n_candidates = int(st.number_input("Kandidat baru per sesi", 3, 60, CANDIDATES_PER_SESSION))
+        use_tuned = st.checkbox("Pakai konfigurasi terbaik di analisis & perbandingan", value=True)
+
+        job_key = f"tune:{run.fingerprint}:{'|'.join(chosen)}:{n_candidates}"
+        job = manager.get(job_key)
+        if chosen and st.button("🎛️ Jalankan / lanjutkan tuning", use_container_width=True):
+            if job is not None and not job.active:
+                manager.forget(job_key)
+
+            def target(job):
+                prep = run.prepared()
+                for name in chosen:
+                    if job.cancel_event.is_set():
+                        return
+                    res = tune_model(name, base_models[name], prep["X_train"], run.y_train,
+                                     run.fingerprint, store, n_candidates=n_candidates)
+                    job.report(name, {
+                        "Model": name,
+                        "Kandidat baru": res["new_candidates"],
+                        "Kandidat dicoba": f"{res['candidates']}/{res['space_size']}",
+                        "CV F1 terbaik": res["best_score"],
+                        "Waktu (s)": res["seconds"],
+                    })
+
+            job = manager.submit(job_key, "Tuning hyperparameter", len(chosen), target)
+        if job is not None and job.active:
+            _job_progress(job_key, ranked=False)
+
+        tuned, best = tuned_models(base_models, run.fingerprint, store)
+        if best:
+            st.dataframe(pd.DataFrame([
+                {"Model": name, "CV F1 (trial terbaik)": trial["mean_score"],
+                 "Fold": ", ".join(f"{s:.3f}" for s in trial["fold_scores"]),
+                 "Konfigurasi": json.dumps(trial["params"])}
+                for name, trial in best.items()
+            ]), use_container_width=True)
+        else:
+            st.caption("Belum ada trial tersimpan untuk dataset ini.")
+
+    return (tuned, best) if use_tuned else (base_models, {})
+
+
+# =========================================================
+# RACING (SUCCESSIVE HALVING)
+# =========================================================
+def _race_outcome(run: TrainingRun, models: dict):
+    # race berjalan sebagai background job (seperti komparasi lengkap): satu baris progres per ronde
+    manager = _job_manager()
+    job_key = "race:" + "|".join(run.key(name, mdl) for name, mdl in models.items())
+    job = manager.get(job_key)
+
+    if job is not None and job.status == "done":
+        outcome = job.results.get("final")
+        # finalis sudah di-reset dari cache/registry -> race diulang
+        if outcome is not None and not run.missing({n: models[n] for n in outcome["entries"]}):
+            return outcome
+        manager.forget(job_key)
+        job = None
+    elif job is not None and job.status in ("cancelled", "error"):
+        snap = job.snapshot()
+        if snap["status"] == "cancelled":
+            st.warning(f"Racing dibatalkan ({snap['done']}/{snap['total']} ronde selesai).")
+            _partial_table(snap["rows"], ranked=False)
+        else:
+            st.error("Racing gagal.")
+            with st.expander("Detail error"):
+                st.code(snap["error"])
+        if not st.button("🔁 Ulangi racing", use_container_width=True):
+            return None
+        manager.forget(job_key)
+        job = None
+
+    if job is None:
+        schedule = race_schedule(len(run.y_train), len(models))
+
+        def target(job):
+            def on_round(r, n_rounds, budget, alive):
+                job.report(f"ronde {r}", {"Ronde": r, "Budget (baris)": budget, "Lolos": ", ".join(alive)})
+
+            outcome = race(run, models, on_round=on_round, cancel=job.cancel_event)
+            if outcome is not None:
+                job.report("final", {"Ronde": len(outcome["schedule"]), "Budget (baris)": len(run.y_train),
+                                     "Lolos": ", ".join(outcome["entries"])}, result=outcome)
+
+        manager.submit(job_key, "Racing (successive halving)", len(schedule), target)
+
+    _job_progress(job_key, ranked=False, unit="ronde")
+    return None
+
+
+# =========================================================
+# KANDIDAT OUT-OF-CORE (BACKGROUND JOB)
+# =========================================================
+def _stream_reader(uploaded):
+    # reader sendiri untuk thread job: posisi file upload tetap dipakai script thread
+    # (sniff header / hash) di rerun berikutnya
+    return io.BytesIO(uploaded.getvalue()) if hasattr(uploaded, "getvalue") else uploaded
+
+
+def _stream_entries(stream_run: StreamingRun, models: dict, uploaded):
+    if not stream_run.missing(models):
+        return stream_run.compare(models)
+
+    manager = _job_manager()
+    job_key = "stream:" + "|".join(stream_run.key(name, mdl) for name, mdl in models.items())
+    job = manager.get(job_key)
+
+    if job is not None and job.status == "done":
+        # job selesai tapi artefak sudah di-reset -> jalankan ulang
+        manager.forget(job_key)
+        job = None
+    elif job is not None and job.status in ("cancelled", "error"):
+        snap = job.snapshot()
+        if snap["status"] == "cancelled":
+            st.warning(f"Training out-of-core dibatalkan ({snap['done']}/{snap['total']} pass selesai).")
+            _partial_table(snap["rows"], ranked=False)
+        else:
+            st.error("Training out-of-core gagal.")
+            with st.expander("Detail error"):
+                st.code(snap["error"])
+        if not st.button("🔁 Ulangi training out-of-core", use_container_width=True):
+            return None
+        manager.forget(job_key)
+        job = None
+
+    if job is None:
+        run = StreamingRun(_stream_reader(uploaded), stream_run.file_hash, stream_run.meta,
+                           stream_run.feature_names, chunksize=stream_run.chunksize,
+                           epochs=stream_run.epochs, cache=stream_run.cache, registry=stream_run.registry)
+        # pass: statistik scaler, tiap epoch, evaluasi holdout
+        stages = ["statistik scaler"] + [f"epoch {e}/{run.epochs}" for e in range(1, run.epochs + 1)]
+
+        def target(job):
+            state = {"epoch": 0, "chunks": 0, "rows": 0}
+
+            def finish_pass():
+                job.report(stages[state["epoch"]], {"Pass": stages[state["epoch"]], "Chunk": state["chunks"],
+                                                    "Baris dibaca": state["rows"]})
+
+            def on_chunk(epoch, n_chunk, rows):
+                if epoch != state["epoch"]:
+                    finish_pass()
+                state.update(epoch=epoch, chunks=n_chunk, rows=rows)
+
+            entries = run.compare(models, on_chunk=on_chunk, cancel=job.cancel_event)
+            if entries is not None:
+                finish_pass()
+                job.report("final", {"Pass": "evaluasi holdout", "Chunk": state["chunks"],
+                                     "Baris dibaca": state["rows"]}, result=entries)
+
+        manager.submit(job_key, "Training out-of-core", len(stages) + 1, target)
+
+    _job_progress(job_key, ranked=False, unit="pass")
+    return None
+
+
+def _race_caption(outcome: dict):
+    saved_rows = 1 - outcome["rows_used"] / outcome["rows_exhaustive"]
+    saved_time = 1 - outcome["time_used"] / outcome["time_exhaustive"] if outcome["time_exhaustive"] else 0.0
+    rounds = " → ".join(f"{count} model @ {budget:,}" for budget, count in outcome["schedule"])
+    st.caption(
+        f"🏁 Racing: {rounds} baris • {outcome['rows_used']:,} dari {outcome['rows_exhaustive']:,} "
+        f"baris-fit ({saved_rows:.0%} lebih hemat) • waktu fit {outcome['time_used']:.1f}s vs "
+        f"≈{outcome['time_exhaustive']:.1f}s bila semua model dilatih penuh ({saved_time:.0%} lebih hemat, estimasi)"
+    )
+
+
+# =========================================================
+# OPERATING POINT (THRESHOLD SWEEP MODEL TERBAIK)
+# =========================================================
+OPERATING_STRATEGIES = {
+    "default": "Default (0.5)",
+    "f1": "F1 maksimum",
+    "recall": "Recall minimum, precision terbaik",
+    "cost": "Biaya (FP/FN) minimum",
+    "manual": "Manual",
+}
+
+
+def _operating_point(curve: dict, dataset_type: str) -> float:
+    # semua threshold berbeda dari kurva skor entry (sort saat metrik dihitung); yang dipilih disimpan
+    # ke trained_pack
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        strategy = st.selectbox("Strategi threshold", list(OPERATING_STRATEGIES),
+                                format_func=OPERATING_STRATEGIES.get, key="op_strategy")
+    with c2:
+        # kesehatan: kasus positif yang terlewat (FN) jauh lebih mahal
+        cost_fn = st.number_input("Biaya False Negative", 0.0, 1000.0,
+                                  5.0 if dataset_type == "health" else 1.0, step=0.5, key="op_cost_fn")
+    with c3:
+        cost_fp = st.number_input("Biaya False Positive", 0.0, 1000.0, 1.0, step=0.5, key="op_cost_fp")
+
+    with span("threshold sweep"):
+        sweep = sweep_from_curve(curve, cost_fp=cost_fp, cost_fn=cost_fn)
+
+    recall_target, manual = None, 0.5
+    if strategy == "recall":
+        recall_target = st.slider("Target recall minimum", 0.5, 1.0,
+                                  0.95 if dataset_type == "health" else 0.9, 0.01, key="op_recall")
+    elif strategy == "manual":
+        manual = st.slider("Threshold", 0.0, 1.0, 0.5, 0.01, key="op_manual")
+    threshold, idx = operating_point(sweep, strategy, recall_target=recall_target, manual=manual)
+    sweep = pd.DataFrame(sweep)
+    point = sweep.iloc[idx]
+
+    k1, k2, k3, k4, k5 = st.columns(5)
+    k1.metric("Threshold", f"{threshold:.3f}")
+    k2.metric("Precision", f"{point['Precision']:.3f}")
+    k3.metric("Recall", f"{point['Recall']:.3f}")
+    k4.metric("F1", f"{point['F1']:.3f}")
+    k5.metric("Biaya", f"{point['Cost']:,.1f}")
+    st.caption(f"TP {point['TP']:,.0f} • FP {point['FP']:,.0f} • FN {point['FN']:,.0f} • TN {point['TN']:,.0f} "
+               f"• {len(sweep) - 1:,} threshold berbeda di test set")
+
+    with span("plot threshold sweep"):
+        fig = px.line(
+            decimate_curve(sweep, ["Threshold", "Precision", "Recall", "F1"]).melt(
+                id_vars="Threshold", value_vars=["Precision", "Recall", "F1"],
+                var_name="Metrik", value_name="Nilai"),
+            x="Threshold", y="Nilai", color="Metrik",
+            title="Precision / Recall / F1 vs Threshold"
+        )
+        fig.add_vline(x=threshold, line_dash="dash")
+        st.plotly_chart(fig, use_container_width=True)
+    return threshold
+
+
 # =========================================================
 # MAIN PAGE
 # =========================================================
@@ -45,7 +481,8 @@ def modeling_page():
 
     uploaded = st.session_state.get("uploaded_file")
     mode = st.session_state.get("dataset_mode", "Auto Detect")
-    pack = load_and_prepare(uploaded, mode)
+    with span("load_and_prepare"):
+        pack = load_and_prepare(uploaded, mode, compact=st.session_state.get("compact", False))
 
     if uploaded is None:
         st.warning("Silakan upload dataset CSV di sidebar terlebih dahulu.")
@@ -77,11 +514,39 @@ def modeling_page():
     # =====================================================
     # SPLIT DATA
     # =====================================================
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+    with span("split data"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=y
+        )
+    fingerprint = meta["fingerprint"]
+
+    with st.expander("⚙️ Indeks KNN"):
+        k1, k2 = st.columns(2)
+        with k1:
+            knn_mode = st.selectbox(
+                "Mode indeks", list(KNN_MODES),
+                format_func={"auto": "Otomatis (dari jumlah baris)", "exact": "Eksak (KD/Ball tree)",
+                             "ivf": "Aproksimasi (IVF)"}.get
+            )
+        with k2:
+            n_probe = st.slider("n_probe IVF (lebih besar = recall naik, lebih lambat)", 1, 64, 8)
+
+    models = _get_models(meta["dataset_type"], n_rows=len(X_train), knn_mode=knn_mode, n_probe=n_probe)
+
+    # model yang sudah pernah dilatih (data + hyperparameter + split sama) dipakai ulang,
+    # scaler di-fit sekali per split lalu dipakai bersama oleh semua model
+    cache = _training_cache()
+    registry = default_registry()
+    run = TrainingRun(
+        X_train, X_test, y_train, y_test, fingerprint,
+        cache=cache, registry=registry, meta=meta
     )
+    memory_caption("halaman Modeling", {
+        "X": X, "y": y, "X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test
+    })
 
-    models = _get_models(meta["dataset_type"])
+    # config terbaik hasil tuning (bila ada) menggantikan hyperparameter default
+    models, tuned_best = _tuning_panel(run, models)
 
     # =====================================================
     # ANALISIS SATU MODEL
@@ -96,20 +561,16 @@ def modeling_page():
         index=list(models.keys()).index("Random Forest")
     )
 
-    pipe = Pipeline([
-        ("scaler", StandardScaler()),
-        ("model", models[model_choice])
-    ])
-
-    pipe.fit(X_train, y_train)
-    y_pred = pipe.predict(X_test)
-    y_proba = pipe.predict_proba(X_test)[:, 1]
+    with span(f"fit {model_choice}"):
+        entry = run.fit(model_choice, models[model_choice])
+    pipe = entry["model"]
+    y_pred = entry["y_pred"]
 
-    acc = accuracy_score(y_test, y_pred)
-    prec = precision_score(y_test, y_pred, zero_division=0)
-    rec = recall_score(y_test, y_pred, zero_division=0)
-    f1 = f1_score(y_test, y_pred, zero_division=0)
-    auc = roc_auc_score(y_test, y_proba)
+    acc = entry["metrics"]["Accuracy"]
+    prec = entry["metrics"]["Precision"]
+    rec = entry["metrics"]["Recall"]
+    f1 = entry["metrics"]["F1"]
+    auc = entry["metrics"]["AUC"]
 
     # =====================================================
     # METRIK
@@ -134,29 +595,28 @@ def modeling_page():
     # CONFUSION MATRIX
     # =====================================================
     st.subheader("📊 Confusion Matrix")
-    cm = confusion_matrix(y_test, y_pred)
-    fig = px.imshow(cm, text_auto=True)
-    st.plotly_chart(fig, use_container_width=True)
+    with span("plot confusion matrix"):
+        cm = confusion(y_test, y_pred)
+        fig = px.imshow(cm, text_auto=True)
+        st.plotly_chart(fig, use_container_width=True)
 
     # =====================================================
     # ROC CURVE
     # =====================================================
     st.subheader("📈 ROC Curve")
-    fpr, tpr, _ = roc_curve(y_test, y_proba)
-
-    roc_df = pd.DataFrame({
-        "False Positive Rate": fpr,
-        "True Positive Rate": tpr
-    })
-
-    fig = px.line(
-        roc_df,
-        x="False Positive Rate",
-        y="True Positive Rate",
-        title=f"ROC Curve – {model_choice} (AUC = {auc:.3f})"
-    )
-    fig.add_shape(type="line", x0=0, x1=1, y0=0, y1=1, line=dict(dash="dash"))
-    st.plotly_chart(fig, use_container_width=True)
+    with span("plot ROC curve"):
+        fpr, tpr, _ = roc_from_curve(_entry_curve(y_test, entry))
+        # maks. CURVE_MAX_POINTS titik ke browser; AUC di judul tetap dari skor penuh
+        roc_df = roc_frame(fpr, tpr)
+
+        fig = px.line(
+            roc_df,
+            x="False Positive Rate",
+            y="True Positive Rate",
+            title=f"ROC Curve – {model_choice} (AUC = {auc:.3f})"
+        )
+        fig.add_shape(type="line", x0=0, x1=1, y0=0, y1=1, line=dict(dash="dash"))
+        st.plotly_chart(fig, use_container_width=True)
 
     # =====================================================
     # FEATURE IMPORTANCE (AMAN & KONSISTEN)
@@ -164,30 +624,33 @@ def modeling_page():
     if model_choice in ["Decision Tree", "Random Forest", "Gradient Boosting"]:
         st.subheader("📌 Feature Importance")
 
-        importances = pipe.named_steps["model"].feature_importances_
-        fi_df = pd.DataFrame({
-            "Feature": X.columns,
-            "Importance": importances
-        }).sort_values("Importance", ascending=False)
-
-        fig = px.bar(
-            fi_df.head(10),
-            x="Importance",
-            y="Feature",
-            orientation="h",
-            title="Top 10 Feature Importance (Tertinggi → Terendah)"
-        )
-        fig.update_layout(
-            yaxis=dict(categoryorder="total ascending"),
-            height=450
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("feature importance"):
+            importances, method = _feature_importance(entry, run)
+            fi_df = pd.DataFrame({
+                "Feature": pipe.named_steps["scaler"].get_feature_names_out(),
+                "Importance": importances
+            }).sort_values("Importance", ascending=False)
+
+            fig = px.bar(
+                fi_df.head(10),
+                x="Importance",
+                y="Feature",
+                orientation="h",
+                title="Top 10 Feature Importance (Tertinggi → Terendah)"
+                      + (" — permutation (ΔAUC)" if method == "permutation" else "")
+            )
+            fig.update_layout(
+                yaxis=dict(categoryorder="total ascending"),
+                height=450
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("🧠 Interpretasi Feature Importance"):
             st.markdown("""
 - Fitur dengan nilai importance tertinggi memiliki pengaruh paling besar terhadap prediksi.
 - Informasi ini membantu interpretasi model pada domain kesehatan maupun lingkungan.
 - Feature importance juga dapat digunakan untuk feature selection pada pengembangan lanjutan.
+- Untuk HistGradientBoosting dipakai *permutation importance*: penurunan ROC–AUC saat nilai satu fitur diacak.
 """)
     else:
         st.info(
@@ -204,53 +667,102 @@ def modeling_page():
     results = []
     trained_models = {}
 
-    for name, mdl in models.items():
-        p = Pipeline([("scaler", StandardScaler()), ("model", mdl)])
-        p.fit(X_train, y_train)
-
-        pr = p.predict(X_test)
-        pr_proba = p.predict_proba(X_test)[:, 1]
-
-        results.append({
-            "Model": name,
-            "Accuracy": accuracy_score(y_test, pr),
-            "Precision": precision_score(y_test, pr, zero_division=0),
-            "Recall": recall_score(y_test, pr, zero_division=0),
-            "F1": f1_score(y_test, pr, zero_division=0),
-            "AUC": roc_auc_score(y_test, pr_proba),
-        })
+    racing = st.radio(
+        "Mode komparasi", ["exhaustive", "racing"], horizontal=True,
+        format_func={"exhaustive": "Lengkap (semua model, 100% data)",
+                     "racing": "Racing (successive halving)"}.get
+    ) == "racing"
+
+    # fit berjalan di background job (thread lain): span ini hanya dispatch + tampilan progres,
+    # waktu fit/predict per model dicatat dari entry yang selesai
+    with span("komparasi semua model (dispatch job)"):
+        if racing:
+            outcome = _race_outcome(run, models)
+            entries = outcome["entries"] if outcome is not None else None
+        else:
+            # semua kandidat dilatih paralel (proses terpisah) sebagai background job;
+            # model yang sudah dilatih di bagian analisis di atas diambil dari cache
+            entries = _comparison_entries(run, models)
+        if entries is not None:
+            _record_fit_times(entries)
+    if entries is None:
+        return
 
-        trained_models[name] = p
+    # racing: hanya finalis yang punya artefak model penuh
+    artifact_keys = {name: run.key(name, models[name]) for name in entries}
+    with span("metrik bertumpuk + bootstrap CI"):
+        ci = _confidence(run.y_test, entries)
+    # kurva skor per model untuk operating point model terbaik
+    holdouts = {}
+    for name, entry in entries.items():
+        results.append({**_result_row(name, entry), **_ci_columns(ci[name])})
+        trained_models[name] = entry["model"]
+        holdouts[name] = _entry_curve(run.y_test, entry)
+
+    # kandidat out-of-core: dilatih langsung dari file per chunk (partial_fit)
+    with st.expander("🌊 Kandidat out-of-core (partial_fit per chunk)"):
+        use_stream = st.checkbox("Tambahkan SGD Logistic, SGD Linear SVM & Naive Bayes yang dilatih per chunk")
+        chunk_rows = int(st.number_input("Ukuran chunk stream (baris)", 10_000, 1_000_000,
+                                         STREAM_CHUNK_ROWS, step=10_000))
+    stream_entries = None
+    if use_stream:
+        stream_run = StreamingRun(
+            uploaded, content_hash(uploaded), meta, list(X.columns),
+            chunksize=chunk_rows, cache=cache, registry=registry
+        )
+        # training stream = beberapa pass atas seluruh file -> background job seperti racing
+        with span("training out-of-core (dispatch job)"):
+            stream_cands = stream_models()
+            stream_entries = _stream_entries(stream_run, stream_cands, uploaded)
+            if stream_entries is not None:
+                _record_fit_times(stream_entries)
+    if stream_entries is not None:
+        st.caption(
+            "🌊 Kandidat (stream) dievaluasi pada holdout 20% yang di-stream per chunk "
+            "(scaler = statistik running dari chunk training)."
+        )
+        # holdout stream berbeda dari test set split -> dievaluasi sebagai kelompok sendiri
+        stream_ci = _confidence(next(iter(stream_entries.values()))["y_test"], stream_entries)
+        for name, entry in stream_entries.items():
+            results.append({**_result_row(name, entry), **_ci_columns(stream_ci[name])})
+            trained_models[name] = entry["model"]
+            artifact_keys[name] = stream_run.key(name, stream_cands[name])
+            holdouts[name] = _entry_curve(entry["y_test"], entry)
 
     result_df = pd.DataFrame(results)
+    result_df["Hyperparameter"] = [
+        f"tuned (CV F1 {tuned_best[name]['mean_score']:.3f})" if name in tuned_best else "default"
+        for name in result_df["Model"]
+    ]
+    _cache_panel(cache, registry, [run.key(name, mdl) for name, mdl in models.items()]
+                 + list(artifact_keys.values()))
 
     # =====================================================
     # PRIORITY TIE-BREAKER (BIAR TERPILIH 1 MODEL)
     # =====================================================
-    priority_order = {
-        "Random Forest": 1,
-        "Gradient Boosting": 2,
-        "Decision Tree": 3,
-        "SVM": 4,
-        "Logistic Regression": 5,
-        "KNN": 6
+    result_df = rank_results(result_df)
+    if racing:
+        # finalis (data penuh) di atas, lalu kandidat tersingkir per ronde (ronde terakhir dulu)
+        result_df = pd.concat([
+            result_df.assign(**{"Budget (baris)": len(X_train), "Ronde": len(outcome["schedule"])}),
+            outcome["eliminated"],
+        ], ignore_index=True)
+        _race_caption(outcome)
+
+    formats = {
+        "Accuracy": "{:.3f}",
+        "Precision": "{:.3f}",
+        "Recall": "{:.3f}",
+        "F1": "{:.3f}",
+        "AUC": "{:.3f}",
+        "Waktu (s)": "{:.2f}",
+        "Latensi (ms/1k)": "{:.2f}",
+        "Recall indeks": "{:.3f}",
+        "Budget (baris)": "{:,.0f}",
+        "Ronde": "{:.0f}",
     }
-
-    result_df["Priority"] = result_df["Model"].map(priority_order)
-
-    result_df = result_df.sort_values(
-        by=["F1", "AUC", "Priority"],
-        ascending=[False, False, True]
-    )
-
     st.dataframe(
-        result_df.drop(columns=["Priority"]).style.format({
-            "Accuracy": "{:.3f}",
-            "Precision": "{:.3f}",
-            "Recall": "{:.3f}",
-            "F1": "{:.3f}",
-            "AUC": "{:.3f}",
-        }),
+        result_df.style.format({c: f for c, f in formats.items() if c in result_df.columns}, na_rep="-"),
         use_container_width=True
     )
 
@@ -258,6 +770,7 @@ def modeling_page():
     # MODEL TERBAIK (FINAL)
     # =====================================================
     best = result_df.iloc[0]
+    pct = f"{CI_LEVEL:.0%}"
 
     st.markdown(
         f"""
@@ -265,8 +778,9 @@ def modeling_page():
   <h3>🏆 Model Terbaik</h3>
   <div class="smallMuted">
     Model <b>{best['Model']}</b> dipilih sebagai model terbaik karena memiliki
-    nilai <b>F1-score ({best['F1']:.3f})</b> dan <b>ROC–AUC ({best['AUC']:.3f})</b>
-    tertinggi.  
+    nilai <b>F1-score ({best['F1']:.3f}; CI {pct} {best[f'F1 {pct} CI']})</b> dan
+    <b>ROC–AUC ({best['AUC']:.3f}; CI {pct} {best[f'AUC {pct} CI']})</b>
+    tertinggi (CI dari bootstrap test set).  
     Jika terdapat nilai evaluasi yang sama, pemilihan model dilakukan
     berdasarkan prioritas stabilitas dan kemampuan generalisasi.
   </div>
@@ -289,6 +803,18 @@ Precision dan Recall, sehingga layak digunakan sebagai sistem pendukung keputusa
 5. Model terbaik digunakan pada tahap prediksi dan rekomendasi.
 """)
 
+    # =====================================================
+    # OPERATING POINT
+    # =====================================================
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.subheader(f"🎚️ Operating Point: {best['Model']}")
+    st.caption(
+        "Threshold probabilitas kelas positif yang dipakai halaman Prediction dan batch scoring. "
+        "Precision, recall, F1 dan biaya dihitung di setiap threshold berbeda dari satu kali sort "
+        "probabilitas test set."
+    )
+    threshold = _operating_point(holdouts[best["Model"]], meta["dataset_type"])
+
     # =====================================================
     # SAVE FOR PREDICTION
     # =====================================================
@@ -296,5 +822,16 @@ Precision dan Recall, sehingga layak digunakan sebagai sistem pendukung keputusa
         "models": trained_models,
         "best_model_name": best["Model"],
         "feature_names": list(X.columns),
-        "meta": meta
+        "meta": meta,
+        "fingerprint": fingerprint,
+        "threshold": threshold,
     }
+
+    # simpan juga ke registry agar session baru / server restart tidak perlu training ulang
+    with span("simpan pack ke registry"):
+        registry.save_pack(
+            fingerprint,
+            st.session_state["trained_pack"],
+            artifact_keys,
+            metrics=result_df.to_dict("records")
+        )
@@ -1,8 +1,97 @@
+import os
+import tempfile
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
 from data_loader import load_and_prepare
+from inference import compile_verified
+from profiling import memory_caption, span
+from registry import default_registry
+from scoring import parquet_available, score_csv
+
+
+# =========================================================
+# COMPILED SCORER (SEKALI PER MODEL, DISIMPAN DI TRAINED PACK)
+# =========================================================
+def _scorer_for(trained_pack: dict, model_name: str, X_check: pd.DataFrame):
+    compiled = trained_pack.setdefault("compiled", {})
+    if model_name not in compiled:
+        model = trained_pack["models"][model_name]
+        # verifikasi pada float64 (input prediksi selalu float64, juga saat dataset compact)
+        compiled[model_name] = compile_verified(model, X_check.head(512).astype(np.float64))[0]
+    return compiled[model_name]
+
+
+# =========================================================
+# BATCH PREDICTION (UPLOAD CSV)
+# =========================================================
+def _batch_section(model, feature_names: list, meta: dict, threshold: float = None):
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.subheader("📦 Prediksi Batch (Upload CSV)")
+    st.caption(
+        "File dibaca per chunk, diproses dengan preprocessing yang sama seperti data latih, "
+        "lalu hasilnya ditulis bertahap ke file output (memori tetap terbatas)."
+    )
+
+    batch_file = st.file_uploader("Upload CSV data baru (boleh .gz / .zst)", type=["csv", "gz", "zst"], key="batch_file")
+    formats = ["CSV", "Parquet"] if parquet_available() else ["CSV"]
+    c1, c2 = st.columns(2)
+    with c1:
+        fmt = st.radio("Format output", formats, horizontal=True).lower()
+    with c2:
+        chunksize = int(st.number_input("Ukuran chunk (baris)", 1_000, 1_000_000, 50_000, step=10_000))
+
+    if batch_file is not None and st.button("📦 Jalankan Prediksi Batch", use_container_width=True):
+        fd, out_path = tempfile.mkstemp(prefix="batch_", suffix=f".{fmt}")
+        os.close(fd)
+
+        progress = st.empty()
+
+        def on_chunk(n_chunks, n_rows):
+            progress.caption(f"⏳ {n_chunks} chunk • {n_rows:,} baris diproses")
+
+        with span("batch scoring"):
+            stats = score_csv(
+                batch_file, model, feature_names, meta, out_path,
+                fmt=fmt, chunksize=chunksize, threshold=threshold, on_chunk=on_chunk
+            )
+        progress.empty()
+
+        old = st.session_state.get("batch_result")
+        if old is not None and os.path.exists(old["path"]):
+            os.remove(old["path"])
+        st.session_state["batch_result"] = {
+            "path": out_path, "fmt": fmt, "stats": stats,
+            "name": os.path.splitext(batch_file.name)[0] + f"_prediksi.{fmt}"
+        }
+
+    result = st.session_state.get("batch_result")
+    if result is None or not os.path.exists(result["path"]):
+        return
+
+    stats = result["stats"]
+    if stats["rows"] == 0:
+        st.warning("File batch tidak berisi baris data.")
+        return
+
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Baris diprediksi", f"{stats['rows']:,}")
+    k2.metric("Waktu", f"{stats['seconds']:.2f} s")
+    k3.metric("Throughput", f"{stats['rows_per_s']:,.0f} baris/s")
+
+    if result["fmt"] == "csv":
+        st.dataframe(pd.read_csv(result["path"], nrows=20), use_container_width=True)
+
+    with open(result["path"], "rb") as f:
+        st.download_button(
+            f"⬇️ Download hasil ({result['fmt'].upper()})",
+            data=f,
+            file_name=result["name"],
+            mime="text/csv" if result["fmt"] == "csv" else "application/octet-stream",
+            use_container_width=True
+        )
 
 
 # =========================================================
@@ -15,7 +104,8 @@ def prediction_page():
     mode = st.session_state.get("dataset_mode", "Auto Detect")
     trained_pack = st.session_state.get("trained_pack")
 
-    pack = load_and_prepare(uploaded, mode)
+    with span("load_and_prepare"):
+        pack = load_and_prepare(uploaded, mode, compact=st.session_state.get("compact", False))
 
     if uploaded is None:
         st.warning("Silakan upload dataset CSV di sidebar terlebih dahulu.")
@@ -25,15 +115,29 @@ def prediction_page():
         st.error(pack.get("error", "Gagal memproses dataset."))
         return
 
+    # model dari session lain / sebelum restart diambil dari registry bila dataset sama
+    fingerprint = pack["meta"]["fingerprint"]
+    if trained_pack is None or trained_pack.get("fingerprint") != fingerprint:
+        with span("load pack dari registry"):
+            stored = default_registry().load_pack(fingerprint)
+        # pack di session milik dataset lain -> tidak dipakai (kolom fitur berbeda)
+        trained_pack = stored
+        if stored is not None:
+            st.session_state["trained_pack"] = stored
+
     if trained_pack is None:
         st.warning("Silakan lakukan proses Modeling terlebih dahulu untuk menentukan model terbaik.")
         return
 
     X = pack["X"]
     meta = pack["meta"]
+    memory_caption("halaman Prediction", {"X": X, "y": pack["y"]})
 
     best_model_name = trained_pack["best_model_name"]
-    model = trained_pack["models"][best_model_name]
+    with span("compile scorer"):
+        model = _scorer_for(trained_pack, best_model_name, X)
+    # operating point dari Modeling; None = pack lama -> kelas dengan probabilitas tertinggi
+    threshold = trained_pack.get("threshold")
 
     # =====================================================
     # INFO MODEL
@@ -44,7 +148,9 @@ def prediction_page():
   <h3>🏆 Model yang Digunakan</h3>
   <div class="smallMuted">
     Prediction menggunakan <b>model terbaik</b> hasil tahap Modeling.<br>
-    <b>Algoritma:</b> {best_model_name}
+    <b>Algoritma:</b> {best_model_name}<br>
+    <b>Inference engine:</b> {"NumPy (compiled)" if model.kind != "sklearn" else "scikit-learn"}<br>
+    <b>Threshold:</b> {f"{threshold:.3f} (operating point)" if threshold is not None else "0.5 (default)"}
   </div>
 </div>
 """,
@@ -74,13 +180,11 @@ def prediction_page():
     if st.button("🔍 Jalankan Prediksi", use_container_width=True):
         input_df = pd.DataFrame([input_data])
 
-        # prediksi kelas
-        pred = int(model.predict(input_df)[0])
-
-        # probabilitas (jika tersedia)
-        prob = None
-        if hasattr(model, "predict_proba"):
-            prob = float(model.predict_proba(input_df)[0][pred]) * 100
+        # kelas + probabilitas dalam satu pass (threshold diterapkan ke predict_proba)
+        with span("predict"):
+            pred, prob1 = model.score(input_df, threshold)
+        pred = int(pred[0])
+        prob = float(prob1[0] if pred == 1 else 1 - prob1[0]) * 100
 
         label = meta["positive_label"] if pred == 1 else meta["negative_label"]
 
@@ -187,3 +291,8 @@ tidak menggantikan keputusan medis profesional.
 berdasarkan hasil prediksi model.
 </div>
 """, unsafe_allow_html=True)
+
+    # =====================================================
+    # BATCH PREDICTION
+    # =====================================================
+    _batch_section(model, trained_pack["feature_names"], meta, threshold)
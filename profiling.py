@@ -0,0 +1,142 @@
+import contextlib
+import cProfile
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(".cache", "profiles"))
+
+# span dikumpulkan per thread script-run (tiap rerun Streamlit punya thread sendiri),
+# jadi modul non-UI (data_loader, training) bisa memakai span() tanpa session_state
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def span(name: str):
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        yield
+        return
+
+    depth = _local.depth
+    _local.depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+        spans.append({"stage": name, "depth": depth, "start": t0, "ms": (time.perf_counter() - t0) * 1000})
+
+
+def record(name: str, seconds: float):
+    # waktu yang diukur di thread lain (JobManager / proses worker) -> baris breakdown di bawah
+    # span aktif; tidak termasuk waktu halaman, jadi tanpa "% halaman"
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append({"stage": name, "depth": _local.depth, "start": time.perf_counter(),
+                      "ms": seconds * 1000, "job": True})
+
+
+def _breakdown(spans: list) -> pd.DataFrame:
+    df = pd.DataFrame(spans).sort_values("start")
+    job = df["job"].eq(True) if "job" in df else pd.Series(False, index=df.index)
+    total = df.loc[(df["depth"] == 0) & ~job, "ms"].sum()
+    df["Stage"] = [" " * d + s for d, s in zip(df["depth"], df["stage"])]
+    df["Waktu (ms)"] = df["ms"].round(1)
+    df["% halaman"] = (df["ms"] / total * 100).round(1) if total else 0.0
+    df.loc[job, "% halaman"] = np.nan
+    return df[["Stage", "Waktu (ms)", "% halaman"]].reset_index(drop=True)
+
+
+def run_page(name: str, page_fn):
+    # mode normal: tanpa overhead
+    if not st.session_state.get("profiling", False):
+        page_fn()
+        return
+
+    _local.spans = []
+    _local.depth = 0
+    profiler = cProfile.Profile() if st.session_state.get("profiling_dump", False) else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        with span(name):
+            page_fn()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        spans = _local.spans
+        _local.spans = None
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+    with st.expander(f"⏱️ Profiling: {name} ({spans[-1]['ms']:.0f} ms)", expanded=True):
+        st.dataframe(_breakdown(spans), use_container_width=True, hide_index=True)
+
+        if profiler is not None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{name.lower()}_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+            profiler.dump_stats(path)
+            st.caption(
+                f"cProfile disimpan ke `{path}` — buka dengan `snakeviz {path}` "
+                "atau konversi ke flamegraph (mis. `flameprof`)."
+            )
+
+
+# =========================================================
+# MEMORY FOOTPRINT (BUFFER YANG DIPAKAI BERSAMA DIHITUNG SEKALI)
+# =========================================================
+def _root(arr: np.ndarray) -> np.ndarray:
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr
+
+
+def memory_footprint(objects: dict) -> pd.DataFrame:
+    # ukuran per objek + berapa yang benar-benar baru (belum dimiliki objek sebelumnya)
+    seen = set()
+    rows = []
+    for name, obj in objects.items():
+        if obj is None:
+            continue
+        if isinstance(obj, pd.Series):
+            obj = obj.to_frame()
+        columns = [obj[c] for c in obj.columns] if isinstance(obj, pd.DataFrame) else [obj]
+        total = new = 0
+        for col in columns:
+            if isinstance(col, pd.Series) and isinstance(col.dtype, pd.SparseDtype):
+                values = col.array.sp_values  # hanya nilai non-fill yang tersimpan
+            elif isinstance(col, pd.Series) and col.dtype.kind in "biuf":
+                values = col.to_numpy()
+            else:
+                values = col
+            if isinstance(values, np.ndarray):
+                root = _root(values)
+                size = values.nbytes
+                if id(root) not in seen:
+                    seen.add(id(root))
+                    new += root.nbytes
+            else:  # kategori / string: tidak dilacak buffernya
+                size = int(col.memory_usage(deep=True, index=False))
+                new += size
+            total += size
+        rows.append({"Objek": name, "Ukuran (MB)": total / 1e6, "Baru (MB)": new / 1e6})
+    return pd.DataFrame(rows)
+
+
+def memory_caption(page: str, objects: dict):
+    fp = memory_footprint(objects)
+    if fp.empty:
+        return
+    def label(r):
+        if r["Baru (MB)"] < 0.01 * r["Ukuran (MB)"]:
+            return " (view)"
+        if r["Baru (MB)"] < 0.99 * r["Ukuran (MB)"]:
+            return f" (+{r['Baru (MB)']:.1f} MB baru)"
+        return ""
+
+    parts = " • ".join(f"{r['Objek']} {r['Ukuran (MB)']:.1f} MB{label(r)}" for _, r in fp.iterrows())
+    st.caption(f"🧠 Memori {page}: {fp['Baru (MB)'].sum():.1f} MB unik — {parts}")
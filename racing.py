@@ -0,0 +1,112 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from estimators import model_variant
+from profiling import span
+from training import SPLIT_SEED, TrainingRun, fit_estimator, rank_results, score_metrics
+
+
+RACE_ETA = 3
+RACE_MIN_ROWS = 1_000
+# jumlah kandidat yang tetap dilatih penuh di ronde terakhir
+RACE_FINALISTS = 1
+
+
+# =========================================================
+# JADWAL SUCCESSIVE HALVING (BUDGET x ETA, KANDIDAT / ETA)
+# =========================================================
+def race_schedule(n_rows: int, n_models: int, eta: int = RACE_ETA, min_rows: int = RACE_MIN_ROWS,
+                  finalists: int = RACE_FINALISTS) -> list:
+    # [(budget_baris, jumlah_kandidat), ...]; ronde terakhir selalu 100% data
+    counts = [n_models]
+    while counts[-1] > finalists:
+        counts.append(max(math.ceil(counts[-1] / eta), finalists))
+    n_rounds = len(counts)
+    budgets = [max(min(min_rows, n_rows), n_rows // eta ** (n_rounds - 1 - r)) for r in range(n_rounds)]
+    schedule = []
+    for budget, count in zip(budgets, counts):
+        # budget yang tidak naik (data kecil) -> ronde dilewati, eliminasi langsung ke ronde berikutnya
+        if not schedule or budget > schedule[-1][0]:
+            schedule.append((budget, count))
+    return schedule
+
+
+def _subsample(y: np.ndarray, budget: int, seed: int) -> np.ndarray:
+    idx = np.arange(len(y))
+    sub, _ = train_test_split(idx, train_size=budget, random_state=seed, stratify=y)
+    return np.sort(sub)
+
+
+# =========================================================
+# RACING (SUBSAMPLE KECIL -> YANG UNGGUL NAIK BUDGET)
+# =========================================================
+def race(run: TrainingRun, models: dict, eta: int = RACE_ETA, min_rows: int = RACE_MIN_ROWS,
+         finalists: int = RACE_FINALISTS, on_round=None, cancel=None):
+    # None bila cancel (threading.Event) di-set sebelum race selesai
+    n = len(run.y_train)
+    schedule = race_schedule(n, len(models), eta, min_rows, finalists)
+    prep = run.prepared()
+
+    alive = dict(models)
+    eliminated = []
+    # fit_time kandidat pada budget terbesar yang dicapai -> estimasi biaya run lengkap
+    last_fit = {}
+    rows_used = 0
+    time_used = 0.0
+
+    for r, (budget, _) in enumerate(schedule[:-1], start=1):
+        idx = _subsample(run.y_train, budget, SPLIT_SEED + r)
+        rows = []
+        for name, mdl in alive.items():
+            if cancel is not None and cancel.is_set():
+                return None
+            with span(f"race ronde {r}: {name}"):
+                fitted = fit_estimator(mdl, prep["X_train"][idx], run.y_train[idx], prep["X_test"])
+            rows.append({
+                "Model": name,
+                "Varian": model_variant(fitted["estimator"]),
+                **score_metrics(run.y_test, fitted["y_pred"], fitted["y_proba"]),
+                "Waktu (s)": fitted["wall_time"],
+                "Budget (baris)": budget,
+                "Ronde": r,
+            })
+            last_fit[name] = (budget, fitted["fit_time"])
+            rows_used += budget
+            time_used += fitted["fit_time"]
+
+        ranked = rank_results(pd.DataFrame(rows))
+        keep = schedule[r][1]
+        eliminated.append(ranked.iloc[keep:])
+        alive = {name: alive[name] for name in ranked["Model"].head(keep)}
+        if on_round is not None:
+            on_round(r, len(schedule), budget, list(alive))
+
+    # ronde final: data penuh lewat TrainingRun (cache/registry + paralel)
+    t0 = time.perf_counter()
+    finished = dict(run.iter_compare(alive, cancel=cancel))
+    if len(finished) < len(alive):
+        return None
+    entries = {name: finished[name] for name in alive}
+    final_time = sum(e["fit_time"] for e in entries.values())
+    rows_used += n * len(entries)
+    time_used += final_time
+
+    # estimasi biaya exhaustive: kandidat tersingkir diekstrapolasi linear dari budget terakhirnya
+    # (batas bawah untuk model superlinear seperti SVM/KNN)
+    time_exhaustive = final_time + sum(
+        fit_time * n / budget for name, (budget, fit_time) in last_fit.items() if name not in entries
+    )
+    return {
+        "entries": entries,
+        "eliminated": pd.concat(eliminated[::-1], ignore_index=True) if eliminated else pd.DataFrame(),
+        "schedule": schedule,
+        "rows_used": rows_used,
+        "rows_exhaustive": n * len(models),
+        "time_used": time_used,
+        "time_exhaustive": time_exhaustive,
+        "final_seconds": time.perf_counter() - t0,
+    }
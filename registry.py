@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+
+import joblib
+import sklearn
+
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(".cache", "models"))
+
+
+def _write_text(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+# =========================================================
+# MODEL REGISTRY (ARTEFAK JOBLIB DI DISK)
+# =========================================================
+# Layout:
+#   artifacts/<training_key>.joblib  -> pipeline + prediksi test + metrik + meta
+#   packs/<dataset_fingerprint>.json -> model terbaik + daftar artefak per dataset
+#   packs/latest_<dataset_type>.json -> pack terakhir per tipe dataset
+class ModelRegistry:
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.saves = 0
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _atomic_write(self, path: str, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # -----------------------------------------------------
+    # ARTEFAK PER MODEL
+    # -----------------------------------------------------
+    def save_artifact(self, key: str, entry: dict, feature_names=None, meta=None):
+        payload = dict(entry)
+        payload["feature_names"] = list(feature_names) if feature_names is not None else None
+        payload["meta"] = meta
+        payload["sklearn_version"] = sklearn.__version__
+
+        # tanpa kompresi agar array numpy bisa di-memmap saat load
+        self._atomic_write(
+            self._path("artifacts", f"{key}.joblib"),
+            lambda tmp: joblib.dump(payload, tmp, compress=0),
+        )
+        with self._lock:
+            self.saves += 1
+
+    def load_artifact(self, key: str):
+        path = self._path("artifacts", f"{key}.joblib")
+        if not os.path.exists(path):
+            return None
+        try:
+            # copy-on-write: halaman dibaca lazily, array tetap writable untuk libsvm/cython
+            payload = joblib.load(path, mmap_mode="c")
+        except Exception:
+            return None
+        if payload.get("sklearn_version") != sklearn.__version__:
+            return None
+        with self._lock:
+            self.loads += 1
+        return payload
+
+    def delete_artifacts(self, keys) -> int:
+        # reset cache dari UI: artefak dihapus agar run berikutnya benar-benar melatih ulang
+        removed = 0
+        for key in set(keys):
+            path = self._path("artifacts", f"{key}.joblib")
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        return removed
+
+    # -----------------------------------------------------
+    # TRAINED PACK (DIPAKAI HALAMAN PREDICTION)
+    # -----------------------------------------------------
+    def save_pack(self, fingerprint: str, trained_pack: dict, artifact_keys: dict, metrics=None):
+        manifest = {
+            "fingerprint": fingerprint,
+            "best_model_name": trained_pack["best_model_name"],
+            "feature_names": list(trained_pack["feature_names"]),
+            "meta": trained_pack["meta"],
+            "threshold": trained_pack.get("threshold"),
+            "artifacts": artifact_keys,
+            "metrics": metrics or [],
+        }
+        text = json.dumps(manifest, indent=2, default=str)
+        for name in (f"{fingerprint}.json", f"latest_{trained_pack['meta']['dataset_type']}.json"):
+            path = self._path("packs", name)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    if f.read() == text:
+                        continue
+            self._atomic_write(path, lambda tmp: _write_text(tmp, text))
+
+    def load_manifest(self, name: str):
+        path = self._path("packs", f"{name}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_pack(self, name: str):
+        # name = fingerprint dataset, atau "latest_health" / "latest_environment"
+        manifest = self.load_manifest(name)
+        if manifest is None:
+            return None
+
+        models = {}
+        for model_name, key in manifest["artifacts"].items():
+            payload = self.load_artifact(key)
+            if payload is None:
+                return None
+            models[model_name] = payload["model"]
+
+        return {
+            "models": models,
+            "best_model_name": manifest["best_model_name"],
+            "feature_names": manifest["feature_names"],
+            "meta": manifest["meta"],
+            "fingerprint": manifest["fingerprint"],
+            # pack lama (sebelum operating point) -> None = argmax / predict bawaan
+            "threshold": manifest.get("threshold"),
+        }
+
+
+_default = None
+
+
+def default_registry() -> ModelRegistry:
+    global _default
+    if _default is None:
+        _default = ModelRegistry()
+    return _default
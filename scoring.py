@@ -0,0 +1,107 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+from data_loader import prepare_features
+from inference import as_scorer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet opsional
+    pa = None
+    pq = None
+
+
+# ringkasan rekomendasi (versi pendek dari kartu di halaman Prediction)
+RECOMMENDATIONS = {
+    "health": {
+        1: "Segera konsultasi dokter & lakukan pemeriksaan lanjutan (USG/mammografi/biopsi).",
+        0: "Lanjutkan pemeriksaan rutin berkala & waspadai perubahan gejala.",
+    },
+    "environment": {
+        1: "Udara relatif aman; kelompok sensitif tetap waspada.",
+        0: "Kurangi aktivitas luar ruangan & gunakan masker.",
+    },
+}
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+# =========================================================
+# SCORING SATU DATAFRAME (VEKTOR, 1 PASS PER CHUNK)
+# =========================================================
+def score_frame(model, X: pd.DataFrame, meta: dict, threshold: float = None) -> pd.DataFrame:
+    pred, proba = as_scorer(model).score(X, threshold)
+    pred = np.asarray(pred).astype(int)
+    confidence = np.where(pred == 1, proba, 1 - proba) * 100
+
+    labels = np.where(pred == 1, meta["positive_label"], meta["negative_label"])
+    recs = RECOMMENDATIONS.get(meta["dataset_type"], {})
+    recommendation = np.where(pred == 1, recs.get(1, ""), recs.get(0, ""))
+
+    return pd.DataFrame({
+        "prediksi": pred,
+        "label": labels,
+        "confidence": confidence.round(2),
+        "rekomendasi": recommendation,
+    }, index=X.index)
+
+
+# =========================================================
+# BATCH SCORING CSV (CHUNKED, MEMORI TERBATAS)
+# =========================================================
+def _batch_dtypes(source, meta: dict) -> dict:
+    # fitur numerik float64 (teks aneh -> NaN lewat fallback iter_csv_typed), kolom lain teks apa adanya:
+    # tidak ada kolom yang tipenya ditebak dari blok pertama, skema output sama di semua chunk
+    numeric = set(meta.get("numeric_features", []))
+    return {c: ("float64" if c.strip() in numeric else "str") for c in ingest.sniff_header(source)}
+
+
+def score_csv(source, model, feature_names: list, meta: dict, out_path: str,
+              fmt: str = "csv", chunksize: int = 50_000, threshold: float = None, on_chunk=None) -> dict:
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("Output Parquet membutuhkan paket 'pyarrow'.")
+
+    t0 = time.perf_counter()
+    rows = 0
+    writer = None
+    dtypes = _batch_dtypes(source, meta)
+    try:
+        for i, chunk in enumerate(ingest.iter_csv_typed(source, dtype=dtypes, chunksize=chunksize)):
+            X = prepare_features(chunk, meta, feature_names)
+            out = pd.concat([chunk, score_frame(model, X, meta, threshold)], axis=1)
+
+            if fmt == "parquet":
+                if writer is None:
+                    table = pa.Table.from_pandas(out, preserve_index=False)
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                else:
+                    # skema chunk pertama dipakai untuk semua chunk berikutnya
+                    table = pa.Table.from_pandas(out, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+            else:
+                out.to_csv(out_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+            rows += len(out)
+            if on_chunk is not None:
+                on_chunk(i + 1, rows)
+    except BaseException:
+        # job gagal / dibatalkan -> jangan tinggalkan file output setengah jadi
+        if writer is not None:
+            writer.close()
+            writer = None
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    seconds = time.perf_counter() - t0
+    return {"rows": rows, "seconds": seconds, "rows_per_s": rows / seconds if seconds else 0.0}
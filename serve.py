@@ -0,0 +1,280 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from inference import affine_params, compile_verified
+from registry import REGISTRY_DIR, ModelRegistry
+from scoring import score_frame
+
+
+# =========================================================
+# MICRO-BATCHER (GABUNG REQUEST BERSAMAAN -> 1x SCORING)
+# =========================================================
+class _Pending:
+    def __init__(self, X: pd.DataFrame):
+        self.X = X
+        self.result = None
+        self.error = None
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    def __init__(self, scorer, meta: dict, max_batch: int = 256, max_wait_ms: float = 5.0,
+                 threshold: float = None):
+        self.scorer = scorer
+        self.meta = meta
+        self.threshold = threshold
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=2000)
+        self._in_flight = 0
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+
+        threading.Thread(target=self._loop, name="micro-batcher", daemon=True).start()
+
+    def submit(self, X: pd.DataFrame) -> pd.DataFrame:
+        item = _Pending(X)
+        self._queue.put(item)
+        item.done.wait()
+        with self._lock:
+            self._latencies.append(time.perf_counter() - item.enqueued)
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _collect(self) -> list:
+        items = [self._queue.get()]
+        n_rows = len(items[0].X)
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item.X)
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            with self._lock:
+                self._in_flight = len(items)
+            try:
+                X = pd.concat([it.X for it in items], ignore_index=True)
+                out = score_frame(self.scorer, X, self.meta, self.threshold)
+                start = 0
+                for it in items:
+                    it.result = out.iloc[start:start + len(it.X)]
+                    start += len(it.X)
+            except Exception as exc:
+                for it in items:
+                    it.error = exc
+            finally:
+                with self._lock:
+                    self._in_flight = 0
+                    self.requests += len(items)
+                    self.rows += sum(len(it.X) for it in items)
+                    self.batches += 1
+                for it in items:
+                    it.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lat = np.asarray(self._latencies) * 1000
+            return {
+                "requests": self.requests,
+                "rows": self.rows,
+                "batches": self.batches,
+                "avg_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self._in_flight,
+                "latency_ms": {
+                    "p50": float(np.percentile(lat, 50)) if len(lat) else None,
+                    "p95": float(np.percentile(lat, 95)) if len(lat) else None,
+                    "p99": float(np.percentile(lat, 99)) if len(lat) else None,
+                    "max": float(lat.max()) if len(lat) else None,
+                },
+            }
+
+
+# =========================================================
+# HTTP HANDLER
+# =========================================================
+class _Server(ThreadingHTTPServer):
+    # banyak klien bersamaan -> backlog lebih besar dari default (5)
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def _make_handler(service: dict):
+    feature_names = service["feature_names"]
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            if service["verbose"]:
+                super().log_message(fmt, *args)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "model": service["model_name"]})
+            elif self.path == "/stats":
+                self._send(200, service["batcher"].stats())
+            elif self.path == "/features":
+                self._send(200, {
+                    "model": service["model_name"],
+                    "engine": service["engine"],
+                    "dataset_type": service["meta"]["dataset_type"],
+                    "feature_names": feature_names,
+                })
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "body harus berupa JSON"})
+                return
+
+            rows = payload.get("rows", payload) if isinstance(payload, dict) else payload
+            if isinstance(rows, dict):
+                rows = [rows]
+            if not isinstance(rows, list) or not rows or not all(isinstance(r, dict) for r in rows):
+                self._send(400, {"error": "kirim 'rows': [ {fitur: nilai, ...}, ... ]"})
+                return
+
+            missing = sorted({f for r in rows for f in feature_names if f not in r})
+            if missing:
+                self._send(400, {"error": "fitur tidak lengkap", "missing": missing})
+                return
+
+            try:
+                X = pd.DataFrame(rows, columns=feature_names).astype(float)
+            except (TypeError, ValueError) as exc:
+                self._send(400, {"error": f"nilai fitur harus numerik: {exc}"})
+                return
+            bad = ~np.isfinite(X.to_numpy())
+            if bad.any():
+                # null / "NaN" / "inf" lolos astype(float); model tidak boleh menebak nilainya
+                self._send(400, {"error": "nilai fitur harus numerik dan finite",
+                                 "invalid": sorted(X.columns[bad.any(axis=0)])})
+                return
+
+            try:
+                out = service["batcher"].submit(X)
+            except Exception as exc:
+                self._send(500, {"error": str(exc)})
+                return
+            self._send(200, {"model": service["model_name"], "predictions": out.to_dict("records")})
+
+    return Handler
+
+
+# =========================================================
+# LOAD MODEL DARI REGISTRY
+# =========================================================
+def load_service(dataset: str = None, fingerprint: str = None, model_name: str = None,
+                 registry_dir: str = REGISTRY_DIR, compile_model: bool = True) -> dict:
+    registry = ModelRegistry(registry_dir)
+    name = fingerprint or f"latest_{dataset}"
+    pack = registry.load_pack(name)
+    if pack is None:
+        raise SystemExit(
+            f"Pack '{name}' tidak ditemukan di {registry_dir}. "
+            "Jalankan halaman Modeling terlebih dahulu untuk dataset ini."
+        )
+
+    model_name = model_name or pack["best_model_name"]
+    if model_name not in pack["models"]:
+        raise SystemExit(f"Model '{model_name}' tidak ada. Pilihan: {', '.join(pack['models'])}")
+    model = pack["models"][model_name]
+
+    engine = "scikit-learn"
+    scorer = model
+    if compile_model:
+        params = affine_params(model.named_steps.get("scaler")) if hasattr(model, "named_steps") else None
+        if params is not None and params[0] is not None:
+            # data sintetis di sekitar statistik scaler untuk verifikasi compiled scorer
+            names, mean, scale = params
+            rng = np.random.default_rng(0)
+            z = rng.standard_normal((512, len(names)))
+            X_check = pd.DataFrame(mean + z * scale, columns=names)[pack["feature_names"]]
+            scorer, _ = compile_verified(model, X_check)
+            engine = "numpy" if scorer.kind != "sklearn" else engine
+
+    return {
+        "model_name": model_name,
+        "feature_names": pack["feature_names"],
+        "meta": pack["meta"],
+        "scorer": scorer,
+        "engine": engine,
+        # operating point hanya berlaku untuk model terbaik yang dipilih di Modeling
+        "threshold": pack["threshold"] if model_name == pack["best_model_name"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="HTTP scoring server lokal untuk model terbaik di model registry."
+    )
+    parser.add_argument("--dataset", choices=["health", "environment"], default="health")
+    parser.add_argument("--fingerprint", help="fingerprint dataset tertentu (default: pack terakhir)")
+    parser.add_argument("--model", help="nama model (default: model terbaik)")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--no-compile", action="store_true", help="pakai pipeline sklearn apa adanya")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    service = load_service(args.dataset, args.fingerprint, args.model, args.registry,
+                           compile_model=not args.no_compile)
+    service["batcher"] = MicroBatcher(service["scorer"], service["meta"],
+                                      max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                                      threshold=service["threshold"])
+    service["verbose"] = args.verbose
+
+    server = _Server((args.host, args.port), _make_handler(service))
+    print(f"Model '{service['model_name']}' ({service['engine']}) siap di "
+          f"http://{args.host}:{args.port}  [POST /predict, GET /stats, GET /features]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
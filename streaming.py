@@ -0,0 +1,201 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+import ingest
+from data_loader import COLUMN_DTYPES, _columns_for, prepare_labeled
+from metrics import binary_report
+from profiling import span
+from training import SPLIT_SEED, TEST_SIZE, TrainingCache, model_config
+
+
+STREAM_CHUNK_ROWS = 100_000
+# epoch SGD setelah pass statistik scaler (running mean/var)
+STREAM_EPOCHS = 2
+# ikut di key artefak: ubah bila cara streaming/holdout berubah
+STREAM_VERSION = 2
+# model yang partial_fit-nya mengakumulasi statistik (jumlah/mean/var per kelas):
+# cukup satu pass, pass kedua menghitung setiap baris dua kali
+SINGLE_PASS = (GaussianNB,)
+
+
+# =========================================================
+# KANDIDAT INCREMENTAL (PUNYA partial_fit)
+# =========================================================
+def stream_models() -> dict:
+    return {
+        "SGD Logistic (stream)": SGDClassifier(loss="log_loss", random_state=42),
+        # modified_huber = hinge yang dihaluskan -> SVM linear yang tetap punya predict_proba
+        "SGD Linear SVM (stream)": SGDClassifier(loss="modified_huber", random_state=42),
+        "Naive Bayes (stream)": GaussianNB(),
+    }
+
+
+def stream_key(file_hash: str, name: str, mdl, chunksize: int, epochs: int) -> str:
+    payload = {
+        "file": file_hash,
+        "model": name,
+        "config": model_config(mdl),
+        "chunksize": chunksize,
+        "epochs": epochs,
+        "split_seed": SPLIT_SEED,
+        "test_size": TEST_SIZE,
+        "version": STREAM_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+# =========================================================
+# CHUNK TERPROSES + SPLIT HOLDOUT DETERMINISTIK
+# =========================================================
+def iter_prepared(source, meta: dict, feature_names: list, chunksize: int = STREAM_CHUNK_ROWS):
+    # yield (X, y, holdout_mask) per chunk; memori = satu chunk, bukan seluruh file
+    usecols = _columns_for(meta["dataset_type"], ingest.sniff_header(source))
+    dtypes = {c: COLUMN_DTYPES[c.strip().lower()] for c in usecols if c.strip().lower() in COLUMN_DTYPES}
+    chunks = ingest.iter_csv_typed(source, dtype=dtypes, usecols=usecols, chunksize=chunksize)
+    for i, chunk in enumerate(chunks):
+        X, y = prepare_labeled(chunk, meta, feature_names)
+        if len(X) == 0:
+            continue
+        # seed per nomor chunk: baris yang sama selalu jatuh ke train/holdout yang sama tiap pass
+        holdout = np.random.default_rng([SPLIT_SEED, i]).random(len(X)) < TEST_SIZE
+        yield X, y.to_numpy(), holdout
+
+
+# =========================================================
+# TRAINING OUT-OF-CORE (SEMUA KANDIDAT DALAM SATU PASS PER EPOCH)
+# =========================================================
+class StreamingRun:
+    def __init__(self, source, file_hash: str, meta: dict, feature_names: list,
+                 chunksize: int = STREAM_CHUNK_ROWS, epochs: int = STREAM_EPOCHS,
+                 cache=None, registry=None):
+        self.source = source
+        self.file_hash = file_hash
+        self.meta = meta
+        self.feature_names = list(feature_names)
+        self.chunksize = chunksize
+        self.epochs = epochs
+        self.cache = cache if cache is not None else TrainingCache()
+        self.registry = registry
+
+    def key(self, name: str, mdl) -> str:
+        return stream_key(self.file_hash, name, mdl, self.chunksize, self.epochs)
+
+    def _lookup(self, key: str, count: bool = True):
+        entry = self.cache.get(key) if count else self.cache.peek(key)
+        if entry is None and self.registry is not None:
+            payload = self.registry.load_artifact(key)
+            if payload is not None:
+                entry = {k: payload[k] for k in payload if k not in ("feature_names", "meta", "sklearn_version")}
+                self.cache.put(key, entry)
+        return entry
+
+    def _chunks(self):
+        return iter_prepared(self.source, self.meta, self.feature_names, self.chunksize)
+
+    def _train(self, models: dict, on_chunk=None, cancel=None):
+        # pass 0: statistik scaler dari semua chunk training; model hanya melihat data
+        # yang di-scale dengan scaler final (beku)
+        scaler = StandardScaler()
+        rows = 0
+        for n_chunk, (X, y, holdout) in enumerate(self._chunks(), start=1):
+            if cancel is not None and cancel.is_set():
+                return None
+            scaler.partial_fit(X[~holdout])
+            rows += len(X)
+            if on_chunk is not None:
+                on_chunk(0, n_chunk, rows)
+
+        fitted = {name: clone(mdl) for name, mdl in models.items()}
+        fit_time = dict.fromkeys(models, 0.0)
+        classes = np.array([0, 1])
+        for epoch in range(self.epochs):
+            # SGD: beberapa epoch; Naive Bayes: hanya epoch pertama
+            active = {name: est for name, est in fitted.items()
+                      if epoch == 0 or not isinstance(est, SINGLE_PASS)}
+            if not active:
+                break
+            for n_chunk, (X, y, holdout) in enumerate(self._chunks(), start=1):
+                if cancel is not None and cancel.is_set():
+                    return None
+                Xt = scaler.transform(X[~holdout])
+                y_tr = y[~holdout]
+                for name, est in active.items():
+                    t0 = time.perf_counter()
+                    est.partial_fit(Xt, y_tr, classes=classes)
+                    fit_time[name] += time.perf_counter() - t0
+                if on_chunk is not None:
+                    on_chunk(epoch + 1, n_chunk, rows)
+        return {"scaler": scaler, "models": fitted, "fit_time": fit_time, "rows": rows}
+
+    def _evaluate(self, trained: dict, cancel=None):
+        # holdout di-stream: yang disimpan hanya y + skor (1D), bukan matriks fitur
+        scaler, fitted = trained["scaler"], trained["models"]
+        y_true, preds, probas = [], {n: [] for n in fitted}, {n: [] for n in fitted}
+        predict_time = dict.fromkeys(fitted, 0.0)
+        for X, y, holdout in self._chunks():
+            if cancel is not None and cancel.is_set():
+                return None
+            if not holdout.any():
+                continue
+            Xt = scaler.transform(X[holdout])
+            y_true.append(y[holdout])
+            for name, est in fitted.items():
+                t0 = time.perf_counter()
+                proba = est.predict_proba(Xt)
+                predict_time[name] += time.perf_counter() - t0
+                probas[name].append(proba[:, 1])
+                preds[name].append(est.classes_[np.argmax(proba, axis=1)])
+
+        y_true = np.concatenate(y_true)
+        entries = {}
+        for name, est in fitted.items():
+            y_pred, y_proba = np.concatenate(preds[name]), np.concatenate(probas[name])
+            entries[name] = {
+                # pipeline seperti TrainingRun agar Prediction/scoring bisa memakai raw DataFrame
+                "model": Pipeline([("scaler", scaler), ("model", est)]),
+                "y_pred": y_pred,
+                "y_proba": y_proba,
+                "y_test": y_true,
+                "fit_time": trained["fit_time"][name],
+                "predict_time": predict_time[name],
+                **binary_report(y_true, y_pred, y_proba),
+                "rows": trained["rows"],
+            }
+        return entries
+
+    def missing(self, models: dict) -> list:
+        return [name for name, mdl in models.items() if self._lookup(self.key(name, mdl), count=False) is None]
+
+    def compare(self, models: dict = None, on_chunk=None, cancel=None):
+        # None bila cancel di-set sebelum training selesai (tidak ada yang disimpan)
+        models = models if models is not None else stream_models()
+        entries = {name: self._lookup(self.key(name, mdl)) for name, mdl in models.items()}
+        pending = {name: models[name] for name, entry in entries.items() if entry is None}
+        if pending:
+            t0 = time.perf_counter()
+            with span("partial_fit per chunk"):
+                trained = self._train(pending, on_chunk=on_chunk, cancel=cancel)
+            if trained is None:
+                return None
+            with span("evaluasi holdout (stream)"):
+                fresh = self._evaluate(trained, cancel=cancel)
+            if fresh is None:
+                return None
+            wall_time = time.perf_counter() - t0
+            for name, entry in fresh.items():
+                # satu pass dipakai bersama -> waktu total dibagi rata antar kandidat
+                entry["wall_time"] = wall_time / len(fresh)
+                key = self.key(name, pending[name])
+                self.cache.put(key, entry)
+                if self.registry is not None:
+                    self.registry.save_artifact(key, entry, feature_names=self.feature_names, meta=self.meta)
+                entries[name] = entry
+        return entries
@@ -0,0 +1,364 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse
+
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import BaseEnsemble
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+from sklearn.pipeline import Pipeline
+from sklearn.tree import BaseDecisionTree
+
+from metrics import binary_metrics, binary_report
+from profiling import span
+
+
+SPLIT_SEED = 42
+TEST_SIZE = 0.2
+
+ENTRY_KEYS = ("model", "y_pred", "y_proba", "fit_time", "predict_time", "wall_time", "metrics", "curve")
+# ikut di key training/split: ubah bila langkah preprocessing berubah
+PREPROCESSING = "standard-scaler+sparse-dummies"
+# batas TrainingCache (LRU): entri model (~ beberapa dataset x kandidat) dan split ter-scale
+CACHE_MAX_ENTRIES = 48
+CACHE_MAX_SPLITS = 2
+
+
+# =========================================================
+# PREPROCESSOR (NUMERIK DI-SCALE, DUMMY KATEGORI TETAP SPARSE)
+# =========================================================
+def _to_csr(X):
+    # dummy sparse dari data_loader -> CSR tanpa densify; input dense (form prediksi) juga diterima
+    if isinstance(X, pd.DataFrame) and all(isinstance(t, pd.SparseDtype) for t in X.dtypes):
+        return X.sparse.to_coo().tocsr()
+    return sparse.csr_matrix(np.asarray(X, dtype=np.float64))
+
+
+def make_scaler(X: pd.DataFrame, meta: dict = None):
+    categorical = [c for c in (meta or {}).get("categorical_features", []) if c in X.columns]
+    if not categorical:
+        return StandardScaler()
+    numeric = [c for c in X.columns if c not in categorical]
+    return ColumnTransformer(
+        [
+            ("num", StandardScaler(), numeric),
+            ("cat", FunctionTransformer(_to_csr, feature_names_out="one-to-one"), categorical),
+        ],
+        sparse_threshold=1.0,
+        verbose_feature_names_out=False,
+    )
+
+
+# =========================================================
+# FINGERPRINT (DATASET + KONFIGURASI MODEL)
+# =========================================================
+def dataset_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    # hash isi data (bukan objek) agar upload ulang file yang sama tetap cocok
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in X.columns]).encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def model_config(mdl) -> dict:
+    params = mdl.get_params(deep=True)
+    return {
+        "class": type(mdl).__name__,
+        "params": {k: repr(v) for k, v in sorted(params.items())},
+    }
+
+
+def training_key(fingerprint: str, name: str, mdl, split_seed: int = SPLIT_SEED,
+                 test_size: float = TEST_SIZE) -> str:
+    payload = {
+        "dataset": fingerprint,
+        "model": name,
+        "config": model_config(mdl),
+        "split_seed": split_seed,
+        "test_size": test_size,
+        "preprocessing": PREPROCESSING,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def split_key(fingerprint: str, split_seed: int = SPLIT_SEED, test_size: float = TEST_SIZE) -> str:
+    payload = {"dataset": fingerprint, "split_seed": split_seed, "test_size": test_size,
+               "preprocessing": PREPROCESSING}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+# =========================================================
+# FIT + SCORE SATU ESTIMATOR (DATA SUDAH DI-SCALE)
+# =========================================================
+def dense_for(est, *arrays):
+    # split tree pada CSR jauh lebih lambat; hasil fit identik dan tetap bisa predict CSR
+    if isinstance(est, (BaseDecisionTree, BaseEnsemble)):
+        return tuple(a.toarray() if sparse.issparse(a) else a for a in arrays)
+    return arrays
+
+
+def fit_estimator(mdl, Xt_train, y_train, Xt_test) -> dict:
+    est = clone(mdl)
+    Xt_train, Xt_test = dense_for(est, Xt_train, Xt_test)
+
+    t0 = time.perf_counter()
+    est.fit(Xt_train, y_train)
+    fit_time = time.perf_counter() - t0
+
+    y_pred = est.predict(Xt_test)
+    t1 = time.perf_counter()
+    y_proba = est.predict_proba(Xt_test)[:, 1]
+    predict_time = time.perf_counter() - t1
+
+    return {
+        "estimator": est,
+        "y_pred": y_pred,
+        "y_proba": y_proba,
+        "fit_time": fit_time,
+        # detik untuk predict_proba seluruh test set (latensi query)
+        "predict_time": predict_time,
+        "wall_time": time.perf_counter() - t0,
+    }
+
+
+def score_metrics(y_test, y_pred, y_proba) -> dict:
+    # satu confusion matrix + satu sort (AUC) menggantikan 5 panggilan sklearn.metrics
+    return binary_metrics(y_test, y_pred, y_proba)
+
+
+# =========================================================
+# RANKING LEADERBOARD (F1 -> AUC -> PRIORITAS STABILITAS)
+# =========================================================
+PRIORITY_ORDER = {
+    "Random Forest": 1,
+    "Gradient Boosting": 2,
+    "Decision Tree": 3,
+    "SVM": 4,
+    "Logistic Regression": 5,
+    "KNN": 6,
+    "SGD Logistic (stream)": 7,
+    "SGD Linear SVM (stream)": 8,
+    "Naive Bayes (stream)": 9,
+}
+
+
+def rank_results(result_df: pd.DataFrame) -> pd.DataFrame:
+    # nilai sama -> model dengan prioritas lebih tinggi (biar terpilih 1 model)
+    priority = result_df["Model"].map(PRIORITY_ORDER)
+    return (result_df.assign(_priority=priority)
+            .sort_values(by=["F1", "AUC", "_priority"], ascending=[False, False, True])
+            .drop(columns=["_priority"]))
+
+
+def _named_fit(name: str, mdl, Xt_train, y_train, Xt_test):
+    return name, fit_estimator(mdl, Xt_train, y_train, Xt_test)
+
+
+def _memmap(folder: str, name: str, arr) -> np.memmap:
+    if sparse.issparse(arr):
+        # CSR dikirim apa adanya (array internalnya di-memmap otomatis oleh joblib)
+        return arr
+    path = os.path.join(folder, f"{name}.npy")
+    np.save(path, np.ascontiguousarray(arr))
+    return np.load(path, mmap_mode="r")
+
+
+# =========================================================
+# TRAINING ORCHESTRATOR (1 SPLIT = 1x FIT SCALER)
+# =========================================================
+class TrainingRun:
+    def __init__(self, X_train, X_test, y_train, y_test, fingerprint: str,
+                 cache=None, registry=None, meta=None):
+        self.X_train = X_train
+        self.X_test = X_test
+        self.y_train = np.asarray(y_train)
+        self.y_test = np.asarray(y_test)
+        self.fingerprint = fingerprint
+        self.cache = cache if cache is not None else TrainingCache()
+        self.registry = registry
+        self.meta = meta
+        self._prepared = None
+
+    def key(self, name: str, mdl) -> str:
+        return training_key(self.fingerprint, name, mdl)
+
+    def _lookup(self, key: str, count: bool = True):
+        # urutan: cache memori -> registry di disk
+        entry = self.cache.get(key) if count else self.cache.peek(key)
+        if entry is None and self.registry is not None:
+            payload = self.registry.load_artifact(key)
+            if payload is not None:
+                # artefak lama belum punya predict_time
+                entry = {k: payload[k] for k in ENTRY_KEYS if k in payload}
+                self.cache.put(key, entry)
+        return entry
+
+    def prepared(self) -> dict:
+        # scaler di-fit sekali per split, hasil transform dipakai semua estimator
+        if self._prepared is None:
+            key = split_key(self.fingerprint)
+            prep = self.cache.get_split(key)
+            if prep is None:
+                with span("fit scaler (1x per split)"):
+                    scaler = make_scaler(self.X_train, self.meta).fit(self.X_train)
+                    prep = {
+                        "scaler": scaler,
+                        "X_train": scaler.transform(self.X_train),
+                        "X_test": scaler.transform(self.X_test),
+                    }
+                self.cache.put_split(key, prep)
+            self._prepared = prep
+        return self._prepared
+
+    def _finish(self, key: str, fitted: dict) -> dict:
+        # pipeline utuh (scaler + model) agar prediction.py tetap bisa memakai raw DataFrame
+        entry = dict(fitted)
+        entry["model"] = Pipeline([
+            ("scaler", self.prepared()["scaler"]),
+            ("model", entry.pop("estimator")),
+        ])
+        with span("hitung metrik"):
+            # kurva (TP/FP per threshold) dari sort yang sama -> ROC & sweep tanpa sort ulang
+            entry.update(binary_report(self.y_test, entry["y_pred"], entry["y_proba"]))
+        self.cache.put(key, entry)
+        if self.registry is not None:
+            with span("simpan artefak registry"):
+                self.registry.save_artifact(key, entry, feature_names=self.X_train.columns, meta=self.meta)
+        return entry
+
+    def fit(self, name: str, mdl) -> dict:
+        key = self.key(name, mdl)
+        entry = self._lookup(key)
+        if entry is None:
+            prep = self.prepared()
+            with span("fit + predict estimator"):
+                fitted = fit_estimator(mdl, prep["X_train"], self.y_train, prep["X_test"])
+            entry = self._finish(key, fitted)
+        return entry
+
+    def missing(self, models: dict) -> list:
+        # model yang belum ada di cache maupun registry (perlu training)
+        return [
+            name for name, mdl in models.items()
+            if self._lookup(self.key(name, mdl), count=False) is None
+        ]
+
+    def iter_compare(self, models: dict, n_jobs: int = -1, cancel=None):
+        # yield (nama, entry) begitu tiap model selesai; berhenti bila cancel di-set
+        pending = {}
+        for name, mdl in models.items():
+            key = self.key(name, mdl)
+            entry = self._lookup(key)
+            if entry is None:
+                pending[name] = (key, mdl)
+            else:
+                yield name, entry
+
+        if not pending:
+            return
+
+        prep = self.prepared()
+        n_jobs = min(effective_n_jobs(n_jobs), len(pending))
+        if n_jobs <= 1:
+            for name, (key, mdl) in pending.items():
+                if cancel is not None and cancel.is_set():
+                    return
+                yield name, self._finish(key, fit_estimator(mdl, prep["X_train"], self.y_train, prep["X_test"]))
+            return
+
+        # worker hanya menerima referensi file memmap, bukan salinan array
+        with tempfile.TemporaryDirectory(prefix="compare_") as folder:
+            Xtr = _memmap(folder, "X_train", prep["X_train"])
+            ytr = _memmap(folder, "y_train", self.y_train)
+            Xte = _memmap(folder, "X_test", prep["X_test"])
+            results = Parallel(n_jobs=n_jobs, backend="loky", return_as="generator_unordered")(
+                delayed(_named_fit)(name, mdl, Xtr, ytr, Xte) for name, (_, mdl) in pending.items()
+            )
+            try:
+                for name, result in results:
+                    yield name, self._finish(pending[name][0], result)
+                    if cancel is not None and cancel.is_set():
+                        return
+            finally:
+                # menutup generator joblib membatalkan task yang belum jalan
+                results.close()
+
+    def compare(self, models: dict, n_jobs: int = -1) -> dict:
+        entries = dict(self.iter_compare(models, n_jobs=n_jobs))
+        return {name: entries[name] for name in models}
+
+
+# =========================================================
+# TRAINING CACHE (DIPAKAI LINTAS RERUN STREAMLIT)
+# =========================================================
+class TrainingCache:
+    # LRU: cache hidup selama proses server (st.cache_resource), jadi dibatasi jumlahnya.
+    # Split (matriks train/test ter-scale) paling besar -> hanya beberapa dataset terakhir.
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_splits: int = CACHE_MAX_SPLITS):
+        self._store = OrderedDict()
+        self._splits = OrderedDict()
+        self.max_entries = max_entries
+        self.max_splits = max_splits
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _touch(store: OrderedDict, key: str):
+        value = store.get(key)
+        if value is not None:
+            store.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _insert(store: OrderedDict, key: str, value, limit: int):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._touch(self._store, key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def peek(self, key: str):
+        with self._lock:
+            return self._store.get(key)
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._insert(self._store, key, entry, self.max_entries)
+
+    def get_split(self, key: str):
+        with self._lock:
+            return self._touch(self._splits, key)
+
+    def put_split(self, key: str, prep: dict):
+        with self._lock:
+            self._insert(self._splits, key, prep, self.max_splits)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self._splits.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._store), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, ParameterGrid, StratifiedKFold
+
+from training import SPLIT_SEED, dense_for, model_config
+
+
+TUNING_DIR = os.environ.get("TUNING_CACHE_DIR", os.path.join(".cache", "tuning"))
+# naikkan bila search space / skema CV berubah (trial lama tidak dicampur)
+SPACE_VERSION = 1
+TUNING_SCORING = "f1"
+TUNING_CV = 3
+# kandidat baru per sesi tuning dan batas total trial per model
+CANDIDATES_PER_SESSION = 12
+MAX_CANDIDATES = 60
+
+
+# =========================================================
+# SEARCH SPACE PER MODEL (DISKRIT -> BISA DI-DEDUP & DISIMPAN JSON)
+# =========================================================
+def search_space(name: str, mdl) -> dict:
+    if name == "Logistic Regression":
+        return {"C": [0.001, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0]}
+    if name == "KNN":
+        space = {"n_neighbors": [3, 5, 7, 9, 11, 15, 21, 31]}
+        if getattr(mdl, "mode", None) == "ivf":
+            space["n_probe"] = [4, 8, 16, 32]
+        return space
+    if name == "SVM":
+        return {"C": [0.1, 0.3, 1.0, 3.0, 10.0, 30.0], "gamma": ["scale", 0.01, 0.03, 0.1, 0.3, 1.0]}
+    if name == "Decision Tree":
+        return {"max_depth": [None, 4, 6, 8, 12, 16, 24], "min_samples_leaf": [1, 2, 5, 10, 20, 50],
+                "criterion": ["gini", "entropy"]}
+    if name == "Random Forest":
+        return {"n_estimators": [100, 200, 400], "max_depth": [None, 8, 12, 16, 24],
+                "min_samples_leaf": [1, 2, 5, 10], "max_features": ["sqrt", 0.5, 1.0]}
+    if name == "Gradient Boosting":
+        if isinstance(mdl, HistGradientBoostingClassifier):
+            return {"learning_rate": [0.03, 0.05, 0.1, 0.2], "max_leaf_nodes": [15, 31, 63, 127],
+                    "min_samples_leaf": [10, 20, 50, 100], "l2_regularization": [0.0, 0.1, 1.0]}
+        return {"learning_rate": [0.03, 0.05, 0.1, 0.2], "n_estimators": [100, 200, 400],
+                "max_depth": [2, 3, 4, 5], "subsample": [0.7, 0.85, 1.0]}
+    return {}
+
+
+def _canon(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def study_key(fingerprint: str, name: str, mdl) -> str:
+    payload = {
+        "dataset": fingerprint,
+        "model": name,
+        "config": model_config(mdl),
+        "space": search_space(name, mdl),
+        "scoring": TUNING_SCORING,
+        "cv": TUNING_CV,
+        "version": SPACE_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+# =========================================================
+# TRIAL STORE (JSONL APPEND-ONLY DI DISK, LINTAS SESSION)
+# =========================================================
+# Layout: <root>/<study_key>.jsonl -> satu baris per (kandidat, iterasi halving):
+#   params, iter, n_resources, fold_scores, mean_score, fit_time, final, session
+class TrialStore:
+    def __init__(self, root: str = TUNING_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.jsonl")
+
+    def load(self, key: str) -> list:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return []
+        trials = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    trials.append(json.loads(line))
+                except ValueError:
+                    # baris terakhir terpotong (proses mati saat menulis) -> abaikan
+                    continue
+        return trials
+
+    def append(self, key: str, trials: list):
+        os.makedirs(self.root, exist_ok=True)
+        text = "".join(json.dumps(t, default=str) + "\n" for t in trials)
+        with self._lock, open(self._path(key), "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def best(self, key: str):
+        # pemenang tiap sesi = kandidat di iterasi terakhir halving; ambil skor CV tertinggi
+        finals = [t for t in self.load(key) if t.get("final")]
+        if not finals:
+            return None
+        return max(finals, key=lambda t: t["mean_score"])
+
+
+_default = None
+
+
+def default_trial_store() -> TrialStore:
+    global _default
+    if _default is None:
+        _default = TrialStore()
+    return _default
+
+
+# =========================================================
+# SUCCESSIVE-HALVING RANDOM SEARCH (LANJUT DARI TRIAL TERSIMPAN)
+# =========================================================
+def _sample_candidates(space: dict, seen: set, n: int, seed: int) -> list:
+    # random search tanpa pengulangan: config yang sudah pernah dicoba tidak diambil lagi
+    remaining = [p for p in ParameterGrid(space) if _canon(p) not in seen]
+    if not remaining:
+        return []
+    rng = np.random.default_rng(seed)
+    pick = rng.choice(len(remaining), size=min(n, len(remaining)), replace=False)
+    return [remaining[i] for i in pick]
+
+
+def tune_model(name: str, mdl, X, y, fingerprint: str, store: TrialStore = None,
+               n_candidates: int = CANDIDATES_PER_SESSION, max_candidates: int = MAX_CANDIDATES,
+               n_jobs: int = -1) -> dict:
+    store = store if store is not None else default_trial_store()
+    key = study_key(fingerprint, name, mdl)
+    space = search_space(name, mdl)
+    trials = store.load(key)
+    seen = {_canon(t["params"]) for t in trials}
+
+    budget = max(0, min(n_candidates, max_candidates - len(seen)))
+    # seed = jumlah config yang sudah dicoba -> sesi berikutnya melanjutkan, bukan mengulang
+    candidates = _sample_candidates(space, seen, budget, SPLIT_SEED + len(seen)) if space else []
+
+    t0 = time.perf_counter()
+    new_trials = []
+    if candidates:
+        X_fit, = dense_for(mdl, X)
+        search = HalvingGridSearchCV(
+            clone(mdl),
+            param_grid=[{k: [v] for k, v in p.items()} for p in candidates],
+            factor=3,
+            min_resources="exhaust",
+            cv=StratifiedKFold(TUNING_CV, shuffle=True, random_state=SPLIT_SEED),
+            scoring=TUNING_SCORING,
+            refit=False,
+            n_jobs=n_jobs,
+            random_state=SPLIT_SEED,
+        ).fit(X_fit, y)
+
+        res = search.cv_results_
+        last_iter = int(np.max(res["iter"]))
+        session = time.time()
+        for i, params in enumerate(res["params"]):
+            new_trials.append({
+                "params": params,
+                "iter": int(res["iter"][i]),
+                "n_resources": int(res["n_resources"][i]),
+                "fold_scores": [float(res[f"split{k}_test_score"][i]) for k in range(TUNING_CV)],
+                "mean_score": float(res["mean_test_score"][i]),
+                "fit_time": float(res["mean_fit_time"][i]),
+                "final": int(res["iter"][i]) == last_iter,
+                "session": session,
+            })
+        store.append(key, new_trials)
+
+    best = store.best(key)
+    return {
+        "key": key,
+        "new_candidates": len(candidates),
+        "new_trials": len(new_trials),
+        "candidates": len(seen) + len(candidates),
+        "space_size": len(ParameterGrid(space)) if space else 0,
+        "seconds": time.perf_counter() - t0,
+        "best_params": best["params"] if best else None,
+        "best_score": best["mean_score"] if best else None,
+    }
+
+
+def tuned_models(models: dict, fingerprint: str, store: TrialStore = None) -> tuple:
+    # (models dengan config terbaik yang tersimpan, {nama: trial terbaik})
+    store = store if store is not None else default_trial_store()
+    tuned, best = {}, {}
+    for name, mdl in models.items():
+        trial = store.best(study_key(fingerprint, name, mdl))
+        if trial is None:
+            tuned[name] = mdl
+            continue
+        tuned[name] = clone(mdl).set_params(**trial["params"])
+        best[name] = trial
+    return tuned, best
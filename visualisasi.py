@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from charts import BOX_MAX_OUTLIERS, box_stats, category_counts, histogram_counts
 from data_loader import load_and_prepare
+from profiling import memory_caption, span
 
 def _descriptive_stats(df: pd.DataFrame):
     # statistik deskriptif yang diminta dosen
@@ -20,12 +23,30 @@ def _descriptive_stats(df: pd.DataFrame):
     }).round(3)
     return out
 
+def _box_figure(stats: list) -> go.Figure:
+    # boxplot dari statistik yang sudah dihitung + sampel outlier (bukan seluruh baris)
+    color = px.colors.qualitative.Plotly[0]
+    fig = go.Figure()
+    for b in stats:
+        name = str(b["group"])
+        fig.add_trace(go.Box(
+            x=[name], q1=[b["q1"]], median=[b["median"]], q3=[b["q3"]],
+            lowerfence=[b["lowerfence"]], upperfence=[b["upperfence"]], mean=[b["mean"]], boxmean=True,
+            name=name, marker_color=color, boxpoints=False, showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=[name] * len(b["outliers"]), y=b["outliers"], mode="markers",
+            marker=dict(color=color, size=5), hoverinfo="y", showlegend=False
+        ))
+    return fig
+
 def visualization_page():
     st.header("📊 Visualization & Descriptive Statistics")
 
     uploaded = st.session_state.get("uploaded_file")
     mode = st.session_state.get("dataset_mode", "Auto Detect")
-    pack = load_and_prepare(uploaded, mode)
+    with span("load_and_prepare"):
+        pack = load_and_prepare(uploaded, mode, compact=st.session_state.get("compact", False))
 
     if uploaded is None:
         st.warning("Silakan upload dataset CSV di sidebar terlebih dahulu.")
@@ -46,6 +67,18 @@ def visualization_page():
     c2.metric(meta["positive_label"], int((y == 1).sum()))
     c3.metric(meta["negative_label"], int((y == 0).sum()))
 
+    src = pack.get("source")
+    if src and src["kind"] == "disk":
+        st.caption(f"⚡ Dataset dibuka dari cache disk (X.npy memmap + dummy sparse CSC .npz) dalam {src['seconds'] * 1000:.0f} ms")
+    ing = pack.get("ingest")
+    if ing:
+        speed = f" • {ing['mb_per_s']:.1f} MB/s" if ing["mb_per_s"] else ""
+        st.caption(
+            f"📥 Parse CSV ({ing['engine']}): {ing['rows']:,} baris dalam {ing['seconds']:.2f}s "
+            f"• {ing['rows_per_s']:,.0f} baris/s{speed} • {ing['chunks']} chunk • {ing['memory_mb']:.1f} MB di memori "
+            f"• {ing['columns']}/{ing['header_columns']} kolom dibaca"
+        )
+
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # FILTER
@@ -64,7 +97,9 @@ def visualization_page():
         )
 
     # pilih feature untuk plot (biar adaptif)
-    feat_cols = list(X.columns)
+    # dummy kategori (sparse) tidak diplot satu per satu
+    categorical = meta.get("categorical_features", [])
+    feat_cols = [c for c in X.columns if c not in categorical]
     if len(feat_cols) < 2:
         st.error("Fitur terlalu sedikit untuk visualisasi.")
         return
@@ -77,14 +112,16 @@ def visualization_page():
     with f3:
         sample_n = st.slider("Sample untuk scatter (cepat)", 300, min(2000, len(df)), min(800, len(df)))
 
-    plot_df = df.copy()
-    plot_df["_target"] = y.values
+    # view (copy-on-write): kolom df tidak disalin, hanya _target yang ditambah
+    plot_df = df.assign(_target=y.values)
+    memory_caption("halaman Visualization", {"X": X, "y": y, "df": df, "plot_df": plot_df})
 
     # =========================
     # DESCRIPTIVE STATISTICS
     # =========================
     st.subheader("📌 Statistik Deskriptif (Mean, Median, Q1, Q3, dst.)")
-    stats = _descriptive_stats(df)
+    with span("statistik deskriptif"):
+        stats = _descriptive_stats(df.drop(columns=categorical))
     if stats is not None:
         st.dataframe(stats, use_container_width=True)
         with st.expander("🧠 Interpretasi Statistik Deskriptif + Rekomendasi"):
@@ -111,9 +148,11 @@ def visualization_page():
 
     with colL:
         st.subheader("1) Distribusi Kelas (Class Balance)")
-        fig = px.histogram(plot_df, x="_target", text_auto=True)
-        fig.update_layout(xaxis_title="Target", yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart distribusi kelas"):
+            # jumlah per kelas dihitung di server: payload 2 bar, bukan seluruh baris
+            fig = px.bar(category_counts(y.values), x="value", y="count", text_auto=True)
+            fig.update_layout(xaxis_title="Target", yaxis_title="Count")
+            st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("📖 Interpretasi + Rekomendasi (Distribusi Kelas)"):
             st.markdown(
@@ -129,9 +168,16 @@ Grafik ini menunjukkan jumlah data untuk kelas **{meta['negative_label']}** vs *
             )
 
         st.subheader("2) Histogram Feature (klik legend untuk hide/show)")
-        fig = px.histogram(plot_df, x=x_col, color="_target", barmode="overlay", opacity=0.6)
-        fig.update_layout(title=f"Distribusi {x_col}", xaxis_title=x_col, yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart histogram"):
+            # bin sama untuk semua kelas, dihitung di server (maks. HIST_MAX_BINS bin per kelas)
+            hist = histogram_counts(df[x_col], y.values)
+            hist = hist.assign(_target=hist["group"].astype(str),
+                               center=(hist["bin_left"] + hist["bin_right"]) / 2)
+            fig = px.bar(hist, x="center", y="count", color="_target", barmode="overlay", opacity=0.6,
+                         hover_data=["bin_left", "bin_right"])
+            fig.update_traces(width=float((hist["bin_right"] - hist["bin_left"]).max()))
+            fig.update_layout(title=f"Distribusi {x_col}", xaxis_title=x_col, yaxis_title="Count", bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("📖 Interpretasi + Rekomendasi (Histogram)"):
             st.markdown(
@@ -147,9 +193,15 @@ fitur tersebut cenderung **informatif** untuk klasifikasi.
             )
 
         st.subheader("3) Boxplot Feature")
-        fig = px.box(plot_df, x="_target", y=y_col, points="outliers")
-        fig.update_layout(title=f"Boxplot {y_col} per Kelas", xaxis_title="Target", yaxis_title=y_col)
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart boxplot"):
+            # kuartil/whisker dihitung di server; outlier dikirim sebagai sampel terbatas
+            boxes = box_stats(df[y_col], y.values)
+            fig = _box_figure(boxes)
+            fig.update_layout(title=f"Boxplot {y_col} per Kelas", xaxis_title="Target", yaxis_title=y_col)
+            st.plotly_chart(fig, use_container_width=True)
+        n_out = sum(b["n_outliers"] for b in boxes)
+        if n_out > sum(len(b["outliers"]) for b in boxes):
+            st.caption(f"Outlier digambar sebagai sampel (maks. {BOX_MAX_OUTLIERS} per kelas) dari {n_out:,} outlier.")
 
         with st.expander("📖 Interpretasi + Rekomendasi (Boxplot)"):
             st.markdown(
@@ -166,10 +218,11 @@ Jika median dan IQR antar kelas berbeda jelas → fitur punya daya pisah lebih b
 
     with colR:
         st.subheader("4) Scatter (Interaktif + Hover)")
-        sc_df = plot_df.sample(n=min(sample_n, len(plot_df)), random_state=42)
-        fig = px.scatter(sc_df, x=x_col, y=y_col, color="_target", hover_data=sc_df.columns[:8])
-        fig.update_layout(title=f"{x_col} vs {y_col}")
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart scatter"):
+            sc_df = plot_df.sample(n=min(sample_n, len(plot_df)), random_state=42)
+            fig = px.scatter(sc_df, x=x_col, y=y_col, color="_target", hover_data=sc_df.columns[:8])
+            fig.update_layout(title=f"{x_col} vs {y_col}")
+            st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("📖 Interpretasi + Rekomendasi (Scatter)"):
             st.markdown(
@@ -185,10 +238,11 @@ Jika titik dua kelas terlihat terpisah → kombinasi fitur tersebut kuat.
             )
 
         st.subheader("5) Correlation Heatmap")
-        corr = pd.DataFrame(X).corr(numeric_only=True)
-        fig = px.imshow(corr, aspect="auto")
-        fig.update_layout(title="Correlation Heatmap")
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart heatmap korelasi"):
+            corr = X[feat_cols].corr(numeric_only=True)
+            fig = px.imshow(corr, aspect="auto")
+            fig.update_layout(title="Correlation Heatmap")
+            st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("📖 Interpretasi + Rekomendasi (Heatmap)"):
             st.markdown(